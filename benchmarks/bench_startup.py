@@ -0,0 +1,84 @@
+"""
+Import-time benchmark: checks that headless commands start without importing wx, and well below GUI startup time
+Each case is run in a fresh interpreter, so it measures a cold start of the Python side (the OS file cache will be warm)
+
+    python benchmarks/bench_startup.py [--repeat 5] [--max-ratio 0.5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_CONFIG = os.path.join(REPOSITORY, "config", "Configuration.xml")
+
+# each case fails if it imports wx, except the GUI import it is compared against
+HEADLESS_CASES = {
+    "import main": "import main",
+    "main.py info": f"import main; main.Main(['info', {SAMPLE_CONFIG!r}])",
+    "main.py validate": f"import main; main.Main(['validate', '--workers', '1', {SAMPLE_CONFIG!r}])",
+}
+GUI_CASE = "import gui"
+NO_WX_CHECK = "; import sys; sys.exit(3 if 'wx' in sys.modules else 0)"
+
+
+def TimeInterpreter(code, repeat):
+    """
+    Run the code in a fresh interpreter several times
+    Returns:
+        (float, int) the best wall clock time in seconds, and the exit code of the last run
+    """
+    best = None
+    returnCode = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-c", code], cwd=REPOSITORY, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        returnCode = completed.returncode
+        best = elapsed if best is None else min(best, elapsed)
+    return best, returnCode
+
+
+def Main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare headless and GUI cold start times")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case, the best time is recorded")
+    parser.add_argument("--max-ratio", type=float, default=0.5, help="Headless start must take less than this fraction of GUI start")
+    options = parser.parse_args(argv)
+
+    results = {"python": sys.version.split()[0], "cases": {}}
+    baseline, _ = TimeInterpreter("pass", options.repeat)
+    results["cases"]["python -c pass"] = {"seconds": baseline}
+
+    passed = True
+    for name, code in HEADLESS_CASES.items():
+        seconds, returnCode = TimeInterpreter(code + NO_WX_CHECK, options.repeat)
+        importedWx = returnCode == 3
+        results["cases"][name] = {"seconds": seconds, "importedWx": importedWx}
+        if importedWx:
+            print(f"FAIL: {name} imported wx", file=sys.stderr)
+            passed = False
+
+    guiSeconds, returnCode = TimeInterpreter(GUI_CASE, options.repeat)
+    if returnCode == 0:
+        results["cases"][GUI_CASE] = {"seconds": guiSeconds}
+        for name in HEADLESS_CASES:
+            ratio = results["cases"][name]["seconds"] / guiSeconds
+            results["cases"][name]["ratioToGui"] = ratio
+            if ratio >= options.max_ratio:
+                print(f"FAIL: {name} takes {ratio:.2f}x of GUI startup, expected below {options.max_ratio}", file=sys.stderr)
+                passed = False
+    else:
+        print("wx is not installed, skipping the comparison with GUI startup", file=sys.stderr)
+
+    for name, case in results["cases"].items():
+        print(f"{name:<20} {case['seconds'] * 1000:8.1f} ms", file=sys.stderr)
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(Main())
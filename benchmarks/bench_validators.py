@@ -0,0 +1,87 @@
+"""
+Micro-benchmarks for the datatype validators
+Compares the per-value cost of the original per-call re.compile validators with the compiled registry,
+for both single value validation and the batch (column) API, then the cost of decoding and constraint checking
+a long Package
+
+    python benchmarks/bench_validators.py [--values 100000] [--package-elements 10000]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import validation
+
+
+def LegacyValidate(text, datatype):
+    """The if/elif dispatch with a re.compile on every call, as it was before the validator registry"""
+    if not text:
+        return True, ""
+    if datatype.lower() == "integer":
+        rule = re.compile(r"^(?:\d+|0[xX][0-9a-fA-F]+)$")
+        if rule.search(text):
+            return True, ""
+        return False, "Integer should be entered in decimal (12) or hexidecimal (0xF)"
+    elif datatype.lower() == "bitmap":
+        rule = re.compile(r"^0b[01]+$")
+        if rule.search(text):
+            return True, ""
+        return False, "BitMap should be entered in the format (0b1010101)"
+    elif datatype.lower() == "package":
+        decOrHexPattern = r"(?:\d+|0[xX][0-9a-fA-F]+)"
+        rule = re.compile(r"^" + decOrHexPattern + r"(?:,\s" + decOrHexPattern + r")*$")
+        if not rule.search(text.strip()):
+            return False, "Package should be enetered as a combination of decimals or hexidecimals in a comma separated list (0xA, 3, 0x4)"
+        return True, ""
+    return False, f"Unknown datatype {datatype}"
+
+
+SAMPLES = {
+    "Integer": ["12", "0xF", "0x1F2E", "4096", "pizza"],
+    "BitMap": ["0b1010101", "0b1", "0b11110000", "0b102"],
+    "Package": ["0xA, 3, 0x4", "1, 2, 3, 4, 5, 6, 7, 8", "0x1,0x2"],
+}
+
+
+def Bench(label, function, count, repeat=5):
+    """Time the function and print the best per-value cost over several runs"""
+    best = min(timeit.repeat(function, number=1, repeat=repeat))
+    print(f"  {label:<28} {best / count * 1e9:10.1f} ns/value")
+    return best / count
+
+
+def Main(argv=None):
+    parser = argparse.ArgumentParser(description="Datatype validator micro-benchmarks")
+    parser.add_argument("--values", type=int, default=100000, help="Number of values validated per datatype")
+    parser.add_argument("--package-elements", type=int, default=10000, help="Number of elements in the Package that is decoded")
+    options = parser.parse_args(argv)
+
+    for datatype, samples in SAMPLES.items():
+        values = (samples * (options.values // len(samples) + 1))[:options.values]
+        print(f"{datatype} ({len(values)} values)")
+        before = Bench("before: per-call re.compile", lambda: [LegacyValidate(value, datatype) for value in values], len(values))
+        single = Bench("after: Validate", lambda: [validation.Validate(value, datatype) for value in values], len(values))
+        batch = Bench("after: ValidateMany", lambda: validation.ValidateMany(values, datatype), len(values))
+        print(f"  speedup: {before / single:.1f}x single, {before / batch:.1f}x batch")
+
+    randomizer = random.Random(0)
+    package = ", ".join(randomizer.choice((str, hex))(randomizer.getrandbits(8)) for _ in range(options.package_elements))
+    constraints = ("0", "255", "8", str(options.package_elements))
+    print(f"Package of {options.package_elements} elements")
+    for label, function in (
+        ("format (regex)", lambda: validation.Validate(package, "Package")),
+        ("decode to array", lambda: validation.Decode(package, "Package")),
+        ("format + decode + constraints", lambda: validation.Validate(package, "Package", constraints)),
+    ):
+        best = min(timeit.repeat(function, number=10, repeat=5)) / 10
+        print(f"  {label:<32} {best * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    Main()
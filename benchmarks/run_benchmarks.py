@@ -0,0 +1,213 @@
+"""
+Benchmark suite covering load, table build, validation and save, on synthetic configs of increasing size
+Results are written as JSON so runs on different commits can be compared
+
+    python benchmarks/run_benchmarks.py --sizes 1000,100000 --output before.json
+    python benchmarks/run_benchmarks.py --sizes 1000,100000 --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cache
+import index
+import loader
+import model
+import synthetic
+import validation
+import writer
+
+DEFAULT_SIZES = "10,1000,10000,100000"
+
+
+def ParseETree(filePath):
+    """The original OpenFileAndLoadXML: parse the whole tree, then walk every Property"""
+    return sum(1 for _ in ET.parse(filePath).getroot().iter("Property"))
+
+
+def LoadRecords(filePath):
+    """What the load worker does to read a file: stream batches of records"""
+    records = []
+    for batch in loader.IterPropertyBatches(filePath):
+        records.extend(batch)
+    return records
+
+
+def BuildIndex(schema):
+    """The name/description index the editor builds in the background once a config has loaded"""
+    propertyIndex = index.PropertyIndex(schema.names, schema.descriptions, schema.descriptionIds)
+    propertyIndex.Build()
+    return propertyIndex
+
+
+def ValidateRecords(records):
+    """The validation done on load, which ValidateAllInput reads from afterwards"""
+    validity = validation.ValidityCache()
+    validity.ValidateRows(0, [record.value for record in records], [record.datatype for record in records])
+    return validity
+
+
+def FewEdits(records, count=5):
+    """Edits spread evenly through the file, including the last property so the save scan runs to the end"""
+    step = max(len(records) // count, 1)
+    positions = list(range(0, len(records), step))[:count - 1] + [len(records) - 1]
+    return {position: "0x1" for position in positions if position >= 0}
+
+
+def RewriteTree(filePath, destPath, records):
+    """The original SaveXMLFile/WriteFile: set every value in a parsed tree and re-serialize all of it"""
+    xmlTree = ET.parse(filePath)
+    for property, record in zip(xmlTree.getroot().iter("Property"), records):
+        property.find("Value").text = record.value
+    xmlTree.write(destPath, encoding="utf-8", xml_declaration=True)
+
+
+def Measure(function, repeat):
+    """
+    Returns:
+        (float) the best wall clock time of several runs, in seconds
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def MeasurePeakMemory(function):
+    """
+    Returns:
+        (int) the peak number of bytes allocated by Python while running the function
+    """
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def RunSize(properties, directory, repeat, memory, generatorOptions):
+    """Generate a config of the given size and time each phase against it"""
+    filePath = os.path.join(directory, f"synthetic-{properties}.xml")
+    savePath = os.path.join(directory, f"synthetic-{properties}-saved.xml")
+    synthetic.GenerateConfig(filePath, properties, **generatorOptions)
+
+    records = LoadRecords(filePath)
+    edits = FewEdits(records)
+    schema = model.TemplateSchema()
+    schema.AppendRecords(records)
+    modelCache = cache.ModelCache(os.path.join(directory, "cache"))
+    model.LoadModel(filePath, modelCache)
+    phases = {
+        "parse_etree": lambda: ParseETree(filePath),
+        "load_stream": lambda: LoadRecords(filePath),
+        "build_index": lambda: BuildIndex(schema),
+        "load_model": lambda: model.LoadModel(filePath),
+        "load_model_cached": lambda: model.LoadModel(filePath, modelCache),
+        "validate_all": lambda: ValidateRecords(records),
+        "validate_file": lambda: validation.ValidateFile(filePath),
+        "save_few_edits": lambda: writer.SaveValues(filePath, savePath, edits),
+        "save_rewrite_tree": lambda: RewriteTree(filePath, savePath, records),
+    }
+
+    result = {"properties": properties, "fileBytes": os.path.getsize(filePath), "edits": len(edits), "phases": {}}
+    for name, function in phases.items():
+        phase = {"seconds": Measure(function, repeat)}
+        if memory:
+            phase["peakBytes"] = MeasurePeakMemory(function)
+        result["phases"][name] = phase
+        print(f"{properties:>10} {name:<20} {phase['seconds'] * 1000:12.2f} ms" + (f" {phase['peakBytes'] / 1e6:10.2f} MB" if memory else ""), file=sys.stderr)
+    os.remove(filePath)
+    modelCache.Clear()
+    if os.path.exists(savePath):
+        os.remove(savePath)
+    return result
+
+
+def CurrentCommit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPOSITORY, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def Compare(results, baseline, threshold):
+    """
+    Print the ratio of each phase's time against a baseline run
+    Returns:
+        (bool) if no phase is slower than the baseline by more than the threshold ratio
+    """
+    baselineResults = {result["properties"]: result for result in baseline["results"]}
+    passed = True
+    print(f"compared with {baseline.get('commit', '')[:12] or 'baseline'}:", file=sys.stderr)
+    for result in results["results"]:
+        previous = baselineResults.get(result["properties"])
+        if not previous:
+            continue
+        for name, phase in result["phases"].items():
+            previousPhase = previous["phases"].get(name)
+            if not previousPhase or not previousPhase["seconds"]:
+                continue
+            ratio = phase["seconds"] / previousPhase["seconds"]
+            regressed = ratio > threshold
+            passed = passed and not regressed
+            print(f"{result['properties']:>10} {name:<20} {ratio:8.2f}x{'  REGRESSION' if regressed else ''}", file=sys.stderr)
+    return passed
+
+
+def Main(argv=None):
+    parser = argparse.ArgumentParser(description="Time loading, validating and saving synthetic configs")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma separated property counts (default {DEFAULT_SIZES})")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per phase, the best time is recorded")
+    parser.add_argument("--memory", action="store_true", help="Also record the peak Python memory of each phase (slower)")
+    parser.add_argument("--mix", type=synthetic.ParseMix, default=synthetic.DEFAULT_MIX, help="Datatype weights, e.g. Integer=2,BitMap=1,Package=1")
+    parser.add_argument("--package-length", type=int, default=16, help="Maximum number of elements in a Package")
+    parser.add_argument("--output", help="Write the results as JSON to this file (default stdout)")
+    parser.add_argument("--compare", help="A previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio that counts as a regression when comparing")
+    options = parser.parse_args(argv)
+
+    generatorOptions = {"mix": options.mix, "packageLength": options.package_length}
+    results = {
+        "commit": CurrentCommit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "generator": {"mix": options.mix, "packageLength": options.package_length},
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for size in options.sizes.split(","):
+            results["results"].append(RunSize(int(size), directory, options.repeat, options.memory, generatorOptions))
+
+    if options.output:
+        with open(options.output, "w") as outputFile:
+            json.dump(results, outputFile, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if options.compare:
+        with open(options.compare) as baselineFile:
+            if not Compare(results, json.load(baselineFile), options.threshold):
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(Main())
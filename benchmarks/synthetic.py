@@ -0,0 +1,169 @@
+"""
+Synthetic Template/Properties/Property config generator for benchmarks
+Files are written as a stream, so configs with millions of properties can be generated without holding them in memory
+
+    python benchmarks/synthetic.py out.xml --properties 100000 --mix Integer=2,BitMap=1,Package=1 --package-length 64
+"""
+
+import argparse
+import random
+
+HEADER = """<?xml version="1.0" ?>
+<!-- Synthetic configuration generated for benchmarks -->
+
+<Template>
+	<Name>Synthetic</Name>
+	<Header>
+		<TemplateType>Benchmark</TemplateType>
+		<Version>1</Version>
+		<Specification>Synthetic Configuration</Specification>
+		<Author>benchmarks/synthetic.py</Author>
+	</Header>
+
+	<Properties>
+"""
+
+FOOTER = """	</Properties>
+</Template>
+"""
+
+PROPERTY = """		<Property>
+			<Name>{name}</Name>
+			<DataType>{datatype}</DataType>
+			<Value>{value}</Value>
+			<Description>{description}</Description>{constraints}
+		</Property>
+"""
+
+BIT_WIDTH = """
+			<BitWidth>{bitWidth}</BitWidth>"""
+
+DEFAULT_MIX = {"Integer": 2, "BitMap": 1, "Package": 1}
+
+WORDS = ("lane", "clock", "register", "timing", "enable", "threshold", "mode", "phy", "csi", "dsi", "packet", "virtual", "channel", "escape", "burst")
+
+
+def ParseMix(text):
+    """
+    Returns:
+        (dict) datatype -> weight, from text like "Integer=2,BitMap=1,Package=1"
+    """
+    mix = {}
+    for entry in text.split(","):
+        datatype, _, weight = entry.partition("=")
+        mix[datatype.strip()] = float(weight or 1)
+    return mix
+
+
+def RandomDecOrHex(randomizer, bits=32):
+    number = randomizer.getrandbits(bits)
+    return hex(number) if randomizer.random() < 0.5 else str(number)
+
+
+def RandomValue(randomizer, datatype, bitmapBits, packageLength):
+    """
+    Returns:
+        (str) a valid value for the datatype, or a random word for datatypes the generator doesn't know
+    """
+    if datatype.lower() == "integer":
+        return RandomDecOrHex(randomizer)
+    if datatype.lower() == "bitmap":
+        return "0b" + "".join(randomizer.choice("01") for _ in range(randomizer.randint(1, bitmapBits)))
+    if datatype.lower() == "package":
+        return ", ".join(RandomDecOrHex(randomizer, 16) for _ in range(randomizer.randint(1, packageLength)))
+    return randomizer.choice(WORDS)
+
+
+def GenerateConfig(
+    filePath,
+    properties,
+    mix=None,
+    bitmapBits=32,
+    packageLength=16,
+    emptyRatio=0.1,
+    invalidRatio=0.0,
+    constrainedRatio=0.0,
+    descriptions=500,
+    descriptionWords=12,
+    seed=0,
+):
+    """
+    Write a synthetic config file
+    Args:
+        properties: number of <Property> elements
+        mix: datatype -> relative weight
+        bitmapBits: maximum number of digits in a BitMap value
+        packageLength: maximum number of elements in a Package value
+        emptyRatio: fraction of properties with an empty <Value>
+        invalidRatio: fraction of properties with a value that fails validation
+        constrainedRatio: fraction of properties with a <BitWidth> constraint, wide enough for the generated values
+        descriptions: number of distinct descriptions shared between the properties
+        descriptionWords: words per description
+        seed: the same seed and arguments always generate the same file
+    """
+    randomizer = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    datatypes = list(mix)
+    weights = [mix[datatype] for datatype in datatypes]
+    descriptionPool = [
+        " ".join(randomizer.choice(WORDS) for _ in range(descriptionWords)).capitalize()
+        for _ in range(max(descriptions, 1))
+    ]
+
+    with open(filePath, "w", encoding="utf-8") as xmlFile:
+        xmlFile.write(HEADER)
+        for index in range(properties):
+            datatype = randomizer.choices(datatypes, weights)[0]
+            roll = randomizer.random()
+            if roll < emptyRatio:
+                value = ""
+            elif roll < emptyRatio + invalidRatio:
+                value = "invalid"
+            else:
+                value = RandomValue(randomizer, datatype, bitmapBits, packageLength)
+            constraints = ""
+            # only draw from the randomizer when enabled, so existing seeds keep generating the same files
+            if constrainedRatio and randomizer.random() < constrainedRatio:
+                bitWidth = {"integer": 32, "bitmap": bitmapBits, "package": 16}.get(datatype.lower())
+                if bitWidth:
+                    constraints = BIT_WIDTH.format(bitWidth=bitWidth)
+            xmlFile.write(PROPERTY.format(
+                name=f"{randomizer.choice(WORDS).upper()}-Property-{index}",
+                datatype=datatype,
+                value=value,
+                description=randomizer.choice(descriptionPool),
+                constraints=constraints,
+            ))
+        xmlFile.write(FOOTER)
+
+
+def Main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic MIPI config file")
+    parser.add_argument("path", help="File to write")
+    parser.add_argument("--properties", type=int, default=10000, help="Number of properties (10 to 1000000+)")
+    parser.add_argument("--mix", type=ParseMix, default=DEFAULT_MIX, help="Datatype weights, e.g. Integer=2,BitMap=1,Package=1")
+    parser.add_argument("--bitmap-bits", type=int, default=32, help="Maximum BitMap length in bits")
+    parser.add_argument("--package-length", type=int, default=16, help="Maximum number of elements in a Package")
+    parser.add_argument("--empty-ratio", type=float, default=0.1, help="Fraction of properties with no value")
+    parser.add_argument("--invalid-ratio", type=float, default=0.0, help="Fraction of properties with an invalid value")
+    parser.add_argument("--constrained-ratio", type=float, default=0.0, help="Fraction of properties with a BitWidth constraint")
+    parser.add_argument("--descriptions", type=int, default=500, help="Number of distinct descriptions")
+    parser.add_argument("--seed", type=int, default=0)
+    options = parser.parse_args(argv)
+
+    GenerateConfig(
+        options.path,
+        options.properties,
+        mix=options.mix,
+        bitmapBits=options.bitmap_bits,
+        packageLength=options.package_length,
+        emptyRatio=options.empty_ratio,
+        invalidRatio=options.invalid_ratio,
+        constrainedRatio=options.constrained_ratio,
+        descriptions=options.descriptions,
+        seed=options.seed,
+    )
+
+
+if __name__ == "__main__":
+    Main()
@@ -0,0 +1,157 @@
+"""
+Bulk apply of value overrides (property name -> value) across many config files, headless
+Each file is streamed once to find its overridden properties, the overrides are validated against that file's
+datatypes and constraints, and only the changed <Value> elements are patched (see writer.SaveValues). Files are processed
+independently in a process pool, so an invalid override or unreadable file only fails that file.
+"""
+
+import csv
+import json
+import logging
+import sys
+import xml.etree.ElementTree as ET
+
+import loader
+import validation
+import writer
+
+
+def LoadOverrides(filePath):
+    """
+    Read an override set, either:
+        a JSON object of name -> value, or a JSON list of {"name": ..., "value": ...} objects
+        a CSV file of name,value rows, with an optional name,value header row
+    Raises OSError if the file cannot be read, or ValueError if it is not a valid override set
+    Returns:
+        (dict) of property name -> value text
+    """
+    if filePath.lower().endswith(".json"):
+        with open(filePath, encoding="utf-8") as overridesFile:
+            try:
+                data = json.load(overridesFile)
+            except json.JSONDecodeError as decodeError:
+                raise ValueError(f"{filePath} is not valid JSON: {decodeError}") from decodeError
+        if isinstance(data, dict):
+            pairs = list(data.items())
+        elif isinstance(data, list) and all(isinstance(item, dict) and "name" in item and "value" in item for item in data):
+            pairs = [(item["name"], item["value"]) for item in data]
+        else:
+            raise ValueError(f"{filePath} should hold an object of name -> value, or a list of name/value objects")
+    else:
+        with open(filePath, newline="", encoding="utf-8") as overridesFile:
+            rows = [row for row in csv.reader(overridesFile) if row]
+        if rows and [cell.strip().lower() for cell in rows[0]] == ["name", "value"]:
+            rows = rows[1:]
+        for line, row in enumerate(rows, start=1):
+            if len(row) != 2:
+                raise ValueError(f"{filePath}: row {line} should have a name and a value, found {len(row)} columns")
+        # whitespace after the comma is allowed, as in the header (name, value)
+        pairs = [(name.strip(), value.strip()) for name, value in rows]
+
+    overrides = {}
+    for name, value in pairs:
+        if not isinstance(name, str) or not name:
+            raise ValueError(f"{filePath}: property names should be non-empty strings, found {name!r}")
+        if isinstance(value, int) and not isinstance(value, bool):
+            value = str(value)
+        if not isinstance(value, str):
+            raise ValueError(f"{filePath}: the value of {name} should be a string or integer, found {value!r}")
+        overrides[name] = value
+    return overrides
+
+
+def ApplyOverridesToFile(filePath, overrides, dryRun=False):
+    """
+    Set the overridden properties of a single config file, every property with an overridden name
+    Nothing is written unless every override found in the file is valid for its datatype and constraints
+    Runs in a worker process when applying in batch, so only returns plain picklable data
+    Returns:
+        (dict) with the file path, the number of properties changed and already set to the override, the override
+            names not found in the file, a list of invalid overrides, whether the file was written, and a file level error
+    """
+    result = {"path": filePath, "changed": 0, "unchanged": 0, "missing": [], "invalid": [], "written": False, "error": ""}
+    edits = {}
+    found = set()
+    try:
+        for record in loader.IterProperties(filePath):
+            value = overrides.get(record.name)
+            if value is None:
+                continue
+            found.add(record.name)
+            isValid, errorMessage = validation.Validate(value, record.datatype, record.constraints)
+            if not isValid:
+                result["invalid"].append({"row": record.position + 1, "name": record.name, "datatype": record.datatype, "value": value, "error": errorMessage})
+            elif value == record.value:
+                result["unchanged"] += 1
+            else:
+                edits[record.position] = value
+    except ET.ParseError as parseError:
+        result["error"] = f"ParseError occurred while reading XML file {filePath}: {parseError.msg}"
+        return result
+    except OSError as osError:
+        result["error"] = f"Unable to read {filePath}: {osError.strerror}"
+        return result
+
+    result["missing"] = sorted(name for name in overrides if name not in found)
+    if result["invalid"]:
+        return result
+    result["changed"] = len(edits)
+    if edits and not dryRun:
+        try:
+            writer.SaveValues(filePath, filePath, edits)
+        except (OSError, ET.ParseError, ValueError) as saveError:
+            result["error"] = f"Unable to save {filePath}: {saveError}"
+            return result
+        result["written"] = True
+    return result
+
+
+def ApplyOverrides(filePaths, overrides, workers=None, dryRun=False):
+    """
+    Apply an override set to many config files, fanning out across a process pool
+    Yields:
+        (dict) the ApplyOverridesToFile result for each file, in the order given
+    """
+    return loader.RunPerFile(ApplyOverridesToFile, filePaths, workers, overrides, dryRun)
+
+
+def RunApplyCommand(overridesPath, paths, workers=None, dryRun=False, output=None):
+    """
+    Apply an override set to the given files and directories, writing one JSON object per line:
+        a "property" record for each invalid override, followed by a "file" summary record for each file
+    Returns:
+        (int) process exit code, 0 if every file was updated (or already up to date), 1 if any failed,
+            and 2 if the override set could not be read
+    """
+    output = output or sys.stdout
+    try:
+        overrides = LoadOverrides(overridesPath)
+    except OSError as osError:
+        output.write(json.dumps({"type": "error", "error": f"Unable to read {overridesPath}: {osError.strerror}"}) + "\n")
+        return 2
+    except ValueError as valueError:
+        output.write(json.dumps({"type": "error", "error": str(valueError)}) + "\n")
+        return 2
+
+    filePaths = loader.FindConfigFiles(paths)
+    logging.info(f"Applying {len(overrides)} override(s) to {len(filePaths)} file(s)")
+
+    allApplied = True
+    for result in ApplyOverrides(filePaths, overrides, workers=workers, dryRun=dryRun):
+        for invalid in result["invalid"]:
+            output.write(json.dumps({"type": "property", "path": result["path"], **invalid}) + "\n")
+        failed = bool(result["invalid"] or result["error"])
+        output.write(json.dumps({
+            "type": "file",
+            "path": result["path"],
+            "applied": not failed,
+            "written": result["written"],
+            "changed": result["changed"],
+            "unchanged": result["unchanged"],
+            "missing": result["missing"],
+            "invalid": len(result["invalid"]),
+            "error": result["error"],
+        }) + "\n")
+        allApplied = allApplied and not failed
+    output.flush()
+    return 0 if allApplied else 1
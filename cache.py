@@ -0,0 +1,304 @@
+"""
+On-disk cache of parsed config models, so reopening an unchanged file skips XML parsing entirely
+Each entry is the model's columns, serialized with marshal (fast to load and limited to plain data, unlike pickle),
+behind a checksum. Entries are keyed by the source file's path, and only used if its size and content hash still
+match. The header holding those is read on its own first, so a file with no usable entry is never hashed up front
+(it is hashed as it is parsed instead, see HashingReader). The least recently used entries are evicted once the
+cache exceeds its size limit.
+"""
+
+import hashlib
+import logging
+import marshal
+import os
+import struct
+import sys
+import tempfile
+from collections import namedtuple
+
+# bump whenever the layout of a cached state changes, so entries written by older versions are ignored
+CACHE_VERSION = 4
+MAGIC = b"MIPIMDL\x00"
+CHECKSUM_SIZE = 32
+# the length of the marshalled header, which follows MAGIC
+HEADER_LENGTH = struct.Struct("<I")
+ENTRY_SUFFIX = ".model"
+DEFAULT_SIZE_LIMIT = 256 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+# every property takes at least this much of an entry (its name, datatype, value and description id), so a config
+# with more than sizeLimit / MIN_ROW_SIZE properties is not even encoded
+MIN_ROW_SIZE = 11
+
+# identifies the exact contents of a source file; mtime is nanoseconds, contentHash a blake2b hex digest, or None
+# until the file is hashed (see StatFileKey)
+FileKey = namedtuple("FileKey", ("path", "mtime", "size", "contentHash"))
+
+
+def DefaultDirectory():
+    """
+    Returns:
+        (str) the per-user cache directory, which can be overridden with the MIPI_CONFIG_CACHE_DIR environment variable
+    """
+    directory = os.environ.get("MIPI_CONFIG_CACHE_DIR")
+    if directory:
+        return directory
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "mipi-config-gui")
+
+
+def StatFileKey(filePath):
+    """
+    Stat a source file, leaving it to be hashed only if the cache may hold it (see ModelCache.Load)
+    Raises OSError if it cannot be read
+    Returns:
+        (FileKey) without a content hash
+    """
+    fileStat = os.stat(filePath)
+    return FileKey(os.path.abspath(filePath), fileStat.st_mtime_ns, fileStat.st_size, None)
+
+
+def HashFile(filePath):
+    """
+    Raises OSError if the file cannot be read
+    Returns:
+        (str) the content hash of a source file
+    """
+    contentHash = hashlib.blake2b()
+    with open(filePath, "rb") as sourceFile:
+        while chunk := sourceFile.read(HASH_CHUNK_SIZE):
+            contentHash.update(chunk)
+    return contentHash.hexdigest()
+
+
+class HashingReader:
+    """
+    Binary file wrapper that hashes everything read through it, so a source file is hashed in the same pass that
+    parses it rather than read twice
+    """
+
+    def __init__(self, sourceFile):
+        self.sourceFile = sourceFile
+        self.contentHash = hashlib.blake2b()
+        self.size = 0
+
+    def read(self, size=-1):
+        data = self.sourceFile.read(size)
+        self.contentHash.update(data)
+        self.size += len(data)
+        return data
+
+    def tell(self):
+        return self.sourceFile.tell()
+
+    def FileKey(self, fileKey):
+        """
+        Returns:
+            (FileKey) for the whole file, from the StatFileKey taken before reading it, once the parser is done
+        """
+        # hash anything the parser left unread after the root element
+        while self.read(HASH_CHUNK_SIZE):
+            pass
+        return fileKey._replace(size=self.size, contentHash=self.contentHash.hexdigest())
+
+
+class ModelCache:
+    """
+    Directory of cached model states, one file per source path
+    The cache is best effort: any error reading or writing it is logged and treated as a miss
+    """
+
+    def __init__(self, directory=None, sizeLimit=DEFAULT_SIZE_LIMIT):
+        self.directory = directory or DefaultDirectory()
+        self.sizeLimit = sizeLimit
+
+    def EntryPath(self, sourcePath):
+        """
+        Returns:
+            (str) the cache file for a source path
+        """
+        pathHash = hashlib.blake2b(os.path.abspath(sourcePath).encode("utf-8", "surrogateescape"), digest_size=16)
+        return os.path.join(self.directory, pathHash.hexdigest() + ENTRY_SUFFIX)
+
+    def Load(self, fileKey):
+        """
+        Args:
+            fileKey: of the source file; if it has no content hash, the file is only hashed once the entry's header
+                shows the entry may be for its contents
+        Returns:
+            (dict) the state cached for the source file, if its contents are unchanged since it was stored, or None
+        """
+        entryPath = self.EntryPath(fileKey.path)
+        try:
+            with open(entryPath, "rb") as entryFile:
+                header = self.ReadHeader(entryFile)
+                if header.get("version") != CACHE_VERSION or header.get("path") != fileKey.path or header.get("size") != fileKey.size:
+                    return None
+                if fileKey.contentHash is None:
+                    fileKey = fileKey._replace(contentHash=HashFile(fileKey.path))
+                if header.get("contentHash") != fileKey.contentHash:
+                    logging.debug(f"Cache entry for {fileKey.path} is out of date")
+                    return None
+                entryFile.seek(0)
+                data = entryFile.read()
+        except FileNotFoundError:
+            return None
+        except OSError as osError:
+            logging.warning(f"Unable to read cache entry {entryPath}: {osError.strerror}")
+            return None
+        except (ValueError, EOFError, TypeError) as decodeError:
+            logging.warning(f"Discarding corrupt cache entry {entryPath}: {decodeError}")
+            self.Remove(fileKey.path)
+            return None
+
+        try:
+            _, state = self.Decode(data)
+        except (ValueError, EOFError, TypeError) as decodeError:
+            logging.warning(f"Discarding corrupt cache entry {entryPath}: {decodeError}")
+            self.Remove(fileKey.path)
+            return None
+        if header.get("mtime") != fileKey.mtime:
+            # touched or copied over with identical contents, the entry is still good
+            logging.debug(f"{fileKey.path} has a new modification time but unchanged contents")
+
+        self.Touch(entryPath)
+        return state
+
+    def Store(self, fileKey, state, rowCount=0):
+        """
+        Cache the state for a source file, replacing any older entry for the same path, then evict down to the size limit
+        Args:
+            rowCount: the number of properties in the state, to skip one that clearly exceeds the size limit before encoding it
+        """
+        if rowCount * MIN_ROW_SIZE > self.sizeLimit:
+            logging.info(f"Not caching {fileKey.path}, its {rowCount} properties would exceed the cache size limit")
+            return
+        header = {"version": CACHE_VERSION, "path": fileKey.path, "mtime": fileKey.mtime, "size": fileKey.size, "contentHash": fileKey.contentHash}
+        data = self.Encode(header, state)
+        if len(data) > self.sizeLimit:
+            logging.info(f"Not caching {fileKey.path}, its entry would exceed the cache size limit")
+            return
+
+        entryPath = self.EntryPath(fileKey.path)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # write beside the entry and rename over it, so a reader never sees a partly written entry
+            with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as tempFile:
+                tempPath = tempFile.name
+                try:
+                    tempFile.write(data)
+                except BaseException:
+                    tempFile.close()
+                    os.remove(tempPath)
+                    raise
+            os.replace(tempPath, entryPath)
+        except OSError as osError:
+            logging.warning(f"Unable to write cache entry {entryPath}: {osError.strerror}")
+            return
+        self.Evict()
+
+    def Encode(self, header, state):
+        """The entry layout: MAGIC, the header's length and marshalled header, then a checksum of the header and payload, then the marshalled state"""
+        headerData = marshal.dumps(header)
+        payload = marshal.dumps(state)
+        checksum = hashlib.blake2b(headerData, digest_size=CHECKSUM_SIZE)
+        checksum.update(payload)
+        return MAGIC + HEADER_LENGTH.pack(len(headerData)) + headerData + checksum.digest() + payload
+
+    def ReadHeader(self, entryFile):
+        """
+        Read just the header at the start of an entry, without checking it against the checksum
+        Raises ValueError (or EOFError, TypeError from marshal) if the entry is truncated or corrupt
+        Returns:
+            (dict)
+        """
+        start = entryFile.read(len(MAGIC) + HEADER_LENGTH.size)
+        if len(start) != len(MAGIC) + HEADER_LENGTH.size or not start.startswith(MAGIC):
+            raise ValueError("not a model cache entry")
+        headerLength, = HEADER_LENGTH.unpack_from(start, len(MAGIC))
+        headerData = entryFile.read(headerLength)
+        if len(headerData) != headerLength:
+            raise ValueError("truncated header")
+        header = marshal.loads(headerData)
+        if not isinstance(header, dict):
+            raise ValueError("unexpected entry layout")
+        return header
+
+    def Decode(self, data):
+        """
+        Raises ValueError (or EOFError, TypeError from marshal) if the entry is truncated or corrupt
+        Returns:
+            (dict, dict) the entry's header and state
+        """
+        headerStart = len(MAGIC) + HEADER_LENGTH.size
+        if not data.startswith(MAGIC) or len(data) < headerStart:
+            raise ValueError("not a model cache entry")
+        headerLength, = HEADER_LENGTH.unpack_from(data, len(MAGIC))
+        checksumStart = headerStart + headerLength
+        payloadStart = checksumStart + CHECKSUM_SIZE
+        headerData = memoryview(data)[headerStart:checksumStart]
+        payload = memoryview(data)[payloadStart:]
+        checksum = hashlib.blake2b(headerData, digest_size=CHECKSUM_SIZE)
+        checksum.update(payload)
+        if len(data) < payloadStart or checksum.digest() != data[checksumStart:payloadStart]:
+            raise ValueError("checksum mismatch")
+        header = marshal.loads(headerData)
+        state = marshal.loads(payload)
+        if not isinstance(header, dict) or not isinstance(state, dict):
+            raise ValueError("unexpected entry layout")
+        return header, state
+
+    def Touch(self, entryPath):
+        """Mark an entry as recently used; an entry's modification time is its last use, for eviction"""
+        try:
+            os.utime(entryPath)
+        except OSError:
+            pass
+
+    def Remove(self, sourcePath):
+        try:
+            os.remove(self.EntryPath(sourcePath))
+        except OSError:
+            pass
+
+    def Entries(self):
+        """
+        Returns:
+            (list) of (last use, size, path) for every entry, least recently used first
+        """
+        entries = []
+        try:
+            with os.scandir(self.directory) as directoryEntries:
+                for entry in directoryEntries:
+                    if entry.name.endswith(ENTRY_SUFFIX) and entry.is_file():
+                        entryStat = entry.stat()
+                        entries.append((entryStat.st_mtime_ns, entryStat.st_size, entry.path))
+        except OSError:
+            return []
+        return sorted(entries)
+
+    def Evict(self):
+        """Remove the least recently used entries until the cache is within its size limit"""
+        entries = self.Entries()
+        totalSize = sum(size for _, size, _ in entries)
+        for _, size, entryPath in entries:
+            if totalSize <= self.sizeLimit:
+                break
+            try:
+                os.remove(entryPath)
+            except OSError:
+                continue
+            totalSize -= size
+            logging.debug(f"Evicted cache entry {entryPath}")
+
+    def Clear(self):
+        """Remove every entry"""
+        for _, _, entryPath in self.Entries():
+            try:
+                os.remove(entryPath)
+            except OSError:
+                pass
@@ -0,0 +1,243 @@
+"""
+Structural diff and three-way merge of config files, matching properties by <Name> rather than by position
+One side is held in a dict keyed by name while the other is streamed past it, and properties are compared by a
+fingerprint (hash) of their datatype, value, description and constraints, so both run in linear time however the files are ordered
+"""
+
+import json
+import logging
+import os
+import sys
+import xml.etree.ElementTree as ET
+from collections import Counter, namedtuple
+
+import loader
+import validation
+import writer
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+# the fields a changed property may differ in
+COMPARED_FIELDS = ("datatype", "value", "description", "constraints")
+
+# kind is ADDED, REMOVED or CHANGED; old and new are the PropertyRecord on each side (None if missing);
+# fields lists the COMPARED_FIELDS that differ
+PropertyChange = namedtuple("PropertyChange", ("kind", "name", "old", "new", "fields"))
+
+# a user edit the merge could not keep as is, and why
+MergeConflict = namedtuple("MergeConflict", ("kind", "name", "userValue", "templateValue", "message"))
+BOTH_CHANGED = "both changed"
+INVALID_FOR_TEMPLATE = "invalid"
+REMOVED_FROM_TEMPLATE = "removed"
+
+
+def Fingerprint(record):
+    """
+    Returns:
+        (int) hash of the property's compared fields, equal for equal properties within one process
+    """
+    return hash((record.datatype, record.value, record.description, record.constraints))
+
+
+def KeyedRecords(records):
+    """
+    Pair each record with the key it is matched on: its name, or (name, n) for the n-th repeat of a name,
+    so repeated names are matched in document order
+    Yields:
+        (key, PropertyRecord)
+    """
+    repeats = {}
+    for record in records:
+        repeat = repeats.get(record.name)
+        if repeat is None:
+            repeats[record.name] = 0
+            yield record.name, record
+        else:
+            repeats[record.name] = repeat + 1
+            yield (record.name, repeat + 1), record
+
+
+def Diff(oldRecords, newRecords):
+    """
+    Compare two sequences of PropertyRecord; only the old side is held in memory
+    Returns:
+        (list) of PropertyChange, in the new side's order, followed by the removed properties in the old side's order
+    """
+    oldProperties = {key: (Fingerprint(record), record) for key, record in KeyedRecords(oldRecords)}
+    changes = []
+    for key, new in KeyedRecords(newRecords):
+        oldEntry = oldProperties.pop(key, None)
+        if oldEntry is None:
+            changes.append(PropertyChange(ADDED, new.name, None, new, ()))
+            continue
+        fingerprint, old = oldEntry
+        if fingerprint == Fingerprint(new):
+            continue
+        fields = tuple(field for field in COMPARED_FIELDS if getattr(old, field) != getattr(new, field))
+        if fields:
+            changes.append(PropertyChange(CHANGED, new.name, old, new, fields))
+    changes.extend(PropertyChange(REMOVED, old.name, old, None, ()) for _, old in oldProperties.values())
+    return changes
+
+
+def DiffFiles(oldPath, newPath):
+    """
+    Raises ET.ParseError or OSError if either file cannot be read
+    Returns:
+        (list) of PropertyChange from oldPath to newPath
+    """
+    return Diff(loader.IterProperties(oldPath), loader.IterProperties(newPath))
+
+
+def ValueChanges(changes):
+    """
+    Returns:
+        (dict) of position -> new value, if the changes only edit values in place,
+            or None if properties were added, removed, moved or changed in any other field
+    """
+    values = {}
+    for change in changes:
+        if change.kind != CHANGED or change.fields != ("value",) or change.old.position != change.new.position:
+            return None
+        values[change.new.position] = change.new.value
+    return values
+
+
+def SummarizeChanges(changes):
+    """
+    Returns:
+        (dict) number of added, removed and changed properties, and of changed values, datatypes, descriptions and constraints
+    """
+    summary = Counter({ADDED: 0, REMOVED: 0, CHANGED: 0})
+    for change in changes:
+        summary[change.kind] += 1
+        for field in change.fields:
+            summary[field + "s"] += 1
+    return dict(summary)
+
+
+def Merge(templateRecords, userRecords, baseRecords=None):
+    """
+    Carry the user's values over to an updated template
+    A user value counts as an edit if it differs from the base template the user's file was made from; without a base,
+    every user value that differs from the updated template does. Edits are kept unless the template also changed
+    that value (the user's value is kept, and reported), the value is invalid for the template's datatype or
+    constraints (the template's value is kept), or the template no longer has the property.
+    Returns:
+        (dict, list, dict) edits as template position -> value, the list of MergeConflict, and counts of what was merged
+    """
+    userValues = {key: record.value for key, record in KeyedRecords(userRecords)}
+    baseValues = None
+    if baseRecords is not None:
+        baseValues = {key: record.value for key, record in KeyedRecords(baseRecords)}
+
+    edits = {}
+    conflicts = []
+    summary = Counter({"properties": 0, "kept": 0, "new": 0, "conflicts": 0})
+    for key, template in KeyedRecords(templateRecords):
+        summary["properties"] += 1
+        userValue = userValues.pop(key, None)
+        if userValue is None:
+            summary["new"] += 1
+            continue
+        baseValue = baseValues.get(key) if baseValues is not None else None
+        edited = userValue != template.value and (baseValue is None or userValue != baseValue)
+        if not edited:
+            continue
+
+        isValid, errorMessage = validation.Validate(userValue, template.datatype, template.constraints)
+        if not isValid:
+            conflicts.append(MergeConflict(INVALID_FOR_TEMPLATE, template.name, userValue, template.value, f"{errorMessage}, kept the template's value"))
+            continue
+        if baseValue is not None and template.value != baseValue:
+            conflicts.append(MergeConflict(BOTH_CHANGED, template.name, userValue, template.value, "Changed in both the template and the user's file, kept the user's value"))
+        edits[template.position] = userValue
+        summary["kept"] += 1
+
+    for key, userValue in userValues.items():
+        baseValue = baseValues.get(key) if baseValues is not None else None
+        if userValue and userValue != baseValue:
+            name = key[0] if isinstance(key, tuple) else key
+            conflicts.append(MergeConflict(REMOVED_FROM_TEMPLATE, name, userValue, None, "No longer in the template, the user's value was dropped"))
+    summary["conflicts"] = len(conflicts)
+    return edits, conflicts, dict(summary)
+
+
+def MergeFiles(templatePath, userPath, outputPath, basePath=None):
+    """
+    Write the updated template to outputPath with the user's edits merged in (see Merge)
+    Only the merged <Value> elements are rewritten, so the rest of the template is kept byte for byte
+    Raises ET.ParseError or OSError if a file cannot be read or written
+    Returns:
+        (list, dict) the MergeConflict list, and counts of what was merged
+    """
+    baseRecords = loader.IterProperties(basePath) if basePath else None
+    edits, conflicts, summary = Merge(loader.IterProperties(templatePath), loader.IterProperties(userPath), baseRecords)
+    writer.SaveValues(templatePath, outputPath, edits)
+    logging.info(f"Merged {len(edits)} values into {outputPath}")
+    return conflicts, summary
+
+
+def RecordFields(record):
+    """
+    Returns:
+        (dict) of the record's compared fields, or None for a missing record
+    """
+    if record is None:
+        return None
+    constraints = dict(zip(loader.CONSTRAINT_TAGS, record.constraints)) if record.constraints else None
+    return {"row": record.position + 1, "datatype": record.datatype, "value": record.value, "description": record.description, "constraints": constraints}
+
+
+def RunDiffCommand(oldPath, newPath, output=None):
+    """
+    Diff two config files, writing a "change" JSON object per line for each property that differs, then a "summary"
+    Returns:
+        (int) process exit code, 0 if the files have the same properties, 1 if they differ, and 2 if one cannot be read
+    """
+    output = output or sys.stdout
+    try:
+        changes = DiffFiles(oldPath, newPath)
+    except ET.ParseError as parseError:
+        output.write(json.dumps({"type": "error", "error": f"ParseError occurred while reading XML file: {parseError.msg}"}) + "\n")
+        return 2
+    except OSError as osError:
+        output.write(json.dumps({"type": "error", "error": f"Unable to read {osError.filename}: {osError.strerror}"}) + "\n")
+        return 2
+
+    for change in changes:
+        output.write(json.dumps({
+            "type": "change",
+            "kind": change.kind,
+            "name": change.name,
+            "fields": list(change.fields),
+            "old": RecordFields(change.old),
+            "new": RecordFields(change.new),
+        }) + "\n")
+    output.write(json.dumps({"type": "summary", "old": oldPath, "new": newPath, **SummarizeChanges(changes)}) + "\n")
+    output.flush()
+    return 1 if changes else 0
+
+
+def RunMergeCommand(templatePath, userPath, outputPath, basePath=None, output=None):
+    """
+    Merge the user's edits into an updated template, writing a "conflict" JSON object per line, then a "summary"
+    Returns:
+        (int) process exit code, 0 if every edit was merged cleanly, 1 if there were conflicts, and 2 on error
+    """
+    output = output or sys.stdout
+    try:
+        conflicts, summary = MergeFiles(templatePath, userPath, outputPath, basePath)
+    except ET.ParseError as parseError:
+        output.write(json.dumps({"type": "error", "error": f"ParseError occurred while reading XML file: {parseError.msg}"}) + "\n")
+        return 2
+    except (OSError, ValueError) as saveError:
+        output.write(json.dumps({"type": "error", "error": f"Unable to merge into {outputPath}: {saveError}"}) + "\n")
+        return 2
+
+    for conflict in conflicts:
+        output.write(json.dumps({"type": "conflict", **conflict._asdict()}) + "\n")
+    output.write(json.dumps({"type": "summary", "template": templatePath, "user": userPath, "output": os.path.abspath(outputPath), **summary}) + "\n")
+    output.flush()
+    return 1 if conflicts else 0
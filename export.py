@@ -0,0 +1,250 @@
+"""
+Streaming export of config properties to JSON lines, CSV, or a packed binary register image for firmware tools
+Exporters take any iterable of PropertyRecord (loader.IterProperties for a file on disk, ConfigModel.IterRecords for
+an open config) and write each property as it arrives, so memory stays bounded however large the config is
+"""
+
+import csv
+import json
+import logging
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from array import array
+
+import loader
+import validation
+
+JSON_LINES = "jsonl"
+CSV = "csv"
+BINARY = "binary"
+FORMATS = (JSON_LINES, CSV, BINARY)
+# file extension -> format, when no format is given
+FORMAT_EXTENSIONS = {".jsonl": JSON_LINES, ".json": JSON_LINES, ".csv": CSV, ".bin": BINARY}
+BYTE_ORDERS = ("little", "big")
+BUFFER_SIZE = 1024 * 1024
+CSV_COLUMNS = ("row", "name", "datatype", "value", "description", *loader.CONSTRAINT_TAGS)
+
+# datatypes packed into binary images -> the width in bits of each number when the property has no <BitWidth>,
+# fixed so a property's place in the image never depends on the value typed into it, and wide enough for any
+# Package element (see validation.DecodePackage)
+DEFAULT_BIT_WIDTHS = {"integer": 64, "bitmap": 64, "package": 64}
+# bytes of the element count written before a Package without <Count>, whose length is only known from its value
+PACKAGE_LENGTH_SIZE = 4
+# element size in bytes -> array typecode, so Package elements of a standard size are packed in one call
+ARRAY_TYPECODES = {array(typecode).itemsize: typecode for typecode in ("Q", "L", "I", "H", "B")}
+
+
+def WriteJSONLines(records, outputFile):
+    """
+    Write one JSON object per property, with its row, name, datatype, value, description and any constraints
+    Returns:
+        (int) the number of properties written
+    """
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    write = outputFile.write
+    count = 0
+    for record in records:
+        fields = {"row": record.position + 1, "name": record.name, "datatype": record.datatype, "value": record.value, "description": record.description}
+        if record.constraints is not None:
+            fields["constraints"] = {tag: text for tag, text in zip(loader.CONSTRAINT_TAGS, record.constraints) if text}
+        write(encode(fields))
+        write("\n")
+        count += 1
+    return count
+
+
+def WriteCSV(records, outputFile):
+    """
+    Write a header, then one row per property, with a column for each constraint (empty if not given)
+    Returns:
+        (int) the number of properties written
+    """
+    writer = csv.writer(outputFile)
+    writer.writerow(CSV_COLUMNS)
+    noConstraints = ("",) * len(loader.CONSTRAINT_TAGS)
+    count = 0
+    for record in records:
+        writer.writerow((record.position + 1, record.name, record.datatype, record.value, record.description, *(record.constraints or noConstraints)))
+        count += 1
+    return count
+
+
+def EncodeRecord(record, byteOrder="little", decoded=None):
+    """
+    Pack a property's value at its declared width: every number of an Integer, BitMap or Package takes <BitWidth>
+    bits rounded up to whole bytes, or its datatype's default width (see DEFAULT_BIT_WIDTHS). Negative numbers are
+    two's complement. A Package with a <Count> takes exactly that many elements; one without is preceded by its
+    element count, as a PACKAGE_LENGTH_SIZE byte unsigned integer. An empty value packs as zeros (for a Package,
+    <Count> zeros, or a count of 0), and other datatypes take no space.
+    Args:
+        decoded: the value's typed form, if it is already known to be valid (see ConfigModel.PeekDecoded),
+            so it is not validated and decoded again
+    Raises ValueError if the value is invalid or does not fit its width
+    Returns:
+        (bytes)
+    """
+    datatype = record.datatype.strip().lower()
+    if datatype not in DEFAULT_BIT_WIDTHS:
+        return b""
+    constraints = validation.ParseConstraints(record.constraints) if record.constraints is not None else None
+    text = record.value.strip()
+    bitWidth = constraints.bitWidth if constraints and constraints.bitWidth else DEFAULT_BIT_WIDTHS[datatype]
+    byteCount = (bitWidth + 7) // 8
+    count = constraints.count if constraints else None
+
+    if not text:
+        if datatype != "package":
+            return bytes(byteCount)
+        if count is None:
+            return bytes(PACKAGE_LENGTH_SIZE)
+        return bytes(byteCount * count)
+
+    if decoded is None:
+        # decoded once, both to check the constraints and to pack
+        isValid, errorMessage, decoded = validation.ValidateDecoded(record.value, record.datatype, record.constraints)
+        if not isValid:
+            raise ValueError(errorMessage)
+
+    if isinstance(decoded, int):
+        try:
+            return decoded.to_bytes(byteCount, byteOrder, signed=decoded < 0)
+        except OverflowError:
+            raise ValueError(f"{record.datatype} {decoded} does not fit in {bitWidth} bits") from None
+
+    packed = PackElements(decoded, byteCount, byteOrder)
+    if packed is None:
+        raise ValueError(f"{record.datatype} elements do not fit in {bitWidth} bits")
+    if count is None:
+        return len(decoded).to_bytes(PACKAGE_LENGTH_SIZE, byteOrder) + packed
+    return packed
+
+
+def PackElements(decoded, byteCount, byteOrder):
+    """
+    Args:
+        decoded: (array) of a Package's elements, see validation.DecodePackage
+    Returns:
+        (bytes) every element packed in byteCount bytes, or None if an element does not fit
+    """
+    typecode = ARRAY_TYPECODES.get(byteCount)
+    if typecode is None:
+        try:
+            return b"".join(number.to_bytes(byteCount, byteOrder) for number in decoded)
+        except OverflowError:
+            return None
+    if typecode != decoded.typecode:
+        try:
+            decoded = array(typecode, decoded)
+        except OverflowError:
+            return None
+    elif byteOrder != sys.byteorder:
+        # swap a copy, since the array may be cached by the model
+        decoded = decoded[:]
+    if byteOrder != sys.byteorder:
+        decoded.byteswap()
+    return decoded.tobytes()
+
+
+def WriteBinary(records, outputFile, byteOrder="little", getDecoded=None):
+    """
+    Write a register image: each property's value packed by EncodeRecord, back to back in document order, without padding
+    Args:
+        getDecoded: function from a row to its cached typed value or None, such as ConfigModel.PeekDecoded
+    Raises ValueError naming the first property that cannot be packed
+    Returns:
+        (int) the number of properties written
+    """
+    write = outputFile.write
+    count = 0
+    for record in records:
+        try:
+            write(EncodeRecord(record, byteOrder, getDecoded(record.position) if getDecoded else None))
+        except ValueError as encodeError:
+            raise ValueError(f"Row {record.position + 1} ({record.name}): {encodeError}") from None
+        count += 1
+    return count
+
+
+def FormatForPath(outputPath):
+    """
+    Returns:
+        (str) the export format implied by the file extension, or None
+    """
+    return FORMAT_EXTENSIONS.get(os.path.splitext(outputPath)[1].lower())
+
+
+def Export(records, outputPath, exportFormat, byteOrder="little", getDecoded=None):
+    """
+    Stream records to outputPath in one of FORMATS; a partly written file is removed if the export fails
+    getDecoded is passed to WriteBinary, to reuse the values a model has already decoded
+    Raises OSError if the file cannot be written, ValueError for a property that cannot be packed in a binary image,
+    and any error raised while reading the records
+    Returns:
+        (int) the number of properties written
+    """
+    if exportFormat not in FORMATS:
+        raise ValueError(f"Unknown export format {exportFormat}, expected one of: {', '.join(FORMATS)}")
+    if byteOrder not in BYTE_ORDERS:
+        raise ValueError(f"Unknown byte order {byteOrder}, expected one of: {', '.join(BYTE_ORDERS)}")
+
+    if exportFormat == BINARY:
+        outputFile = open(outputPath, "wb", buffering=BUFFER_SIZE)
+    else:
+        outputFile = open(outputPath, "w", encoding="utf-8", newline="", buffering=BUFFER_SIZE)
+    try:
+        with outputFile:
+            if exportFormat == JSON_LINES:
+                count = WriteJSONLines(records, outputFile)
+            elif exportFormat == CSV:
+                count = WriteCSV(records, outputFile)
+            else:
+                count = WriteBinary(records, outputFile, byteOrder, getDecoded)
+    except BaseException:
+        try:
+            os.remove(outputPath)
+        except OSError:
+            pass
+        raise
+    logging.info(f"Exported {count} properties to {outputPath}")
+    return count
+
+
+def RunExportCommand(filePath, outputPath, exportFormat=None, byteOrder="little", output=None):
+    """
+    Export a config file, streaming it straight from the parser, then write a "summary" JSON object
+    Returns:
+        (int) process exit code, 0 if the file was exported, and 2 if it could not be read, packed or written
+    """
+    output = output or sys.stdout
+    exportFormat = exportFormat or FormatForPath(outputPath)
+    if exportFormat is None:
+        output.write(json.dumps({"type": "error", "error": f"Unable to tell the export format of {outputPath}, give one with --format"}) + "\n")
+        return 2
+
+    startTime = time.perf_counter()
+    try:
+        count = Export(loader.IterProperties(filePath), outputPath, exportFormat, byteOrder)
+    except ET.ParseError as parseError:
+        output.write(json.dumps({"type": "error", "error": f"ParseError occurred while reading XML file {filePath}: {parseError.msg}"}) + "\n")
+        return 2
+    except OSError as osError:
+        output.write(json.dumps({"type": "error", "error": f"Unable to export {filePath}: {osError.strerror} ({osError.filename})"}) + "\n")
+        return 2
+    except ValueError as valueError:
+        output.write(json.dumps({"type": "error", "error": f"Unable to export {filePath}: {valueError}"}) + "\n")
+        return 2
+
+    output.write(json.dumps({
+        "type": "summary",
+        "path": filePath,
+        "output": os.path.abspath(outputPath),
+        "format": exportFormat,
+        "byteOrder": byteOrder if exportFormat == BINARY else None,
+        "properties": count,
+        "bytes": os.path.getsize(outputPath),
+        "seconds": round(time.perf_counter() - startTime, 3),
+    }) + "\n")
+    output.flush()
+    return 0
@@ -0,0 +1,1516 @@
+"""
+wx user interface of the MIPI configuration editor
+Only imported when the editor is started (see main.py), so headless commands never load wx
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+import wx
+import wx.grid
+import xml.etree.ElementTree as ET
+
+import cache
+import diff
+import export
+import loader
+import model
+import profiling
+import validation
+
+# how often open files are checked for changes made outside the editor
+WATCH_INTERVAL_MS = 1000
+# a refresh that changes more rows than this repaints the whole grid rather than row by row
+REFRESH_ROW_LIMIT = 100
+# a value being typed is validated once the user pauses for this long
+VALIDATION_DELAY_MS = 250
+# longer values (large Packages) are validated on a background thread, so typing never waits for them
+INLINE_VALIDATION_LIMIT = 1000
+INVALID_COLOUR = (255, 200, 200)
+# File -> Export choices, in the order of the save dialog's wildcard: (label, extension, format, byte order)
+EXPORT_CHOICES = (
+    ("JSON lines", "jsonl", export.JSON_LINES, "little"),
+    ("CSV", "csv", export.CSV, "little"),
+    ("Binary register image, little-endian", "bin", export.BINARY, "little"),
+    ("Binary register image, big-endian", "bin", export.BINARY, "big"),
+)
+
+
+class MIPIPropertyTable(wx.grid.GridTableBase):
+    """
+    Virtual table that backs the main grid, as a thin view over a ConfigModel
+    The grid only asks for the rows that are scrolled into view, so no widgets are created per property
+    """
+
+    NAME_COLUMN = 0
+    DATATYPE_COLUMN = 1
+    VALUE_COLUMN = 2
+    COLUMN_LABELS = ("Property Name", "Data Type", "Value")
+    NO_DESCRIPTION = "(no description provided)"
+
+    def __init__(self, configModel=None):
+        super().__init__()
+        self.model = configModel if configModel is not None else model.ConfigModel()
+        # rows the grid has been told about; while a file is loading the model may already hold more
+        self.rowCount = len(self.model)
+
+        # attributes are shared by every cell in a column, rather than stored per cell
+        self.readOnlyAttr = wx.grid.GridCellAttr()
+        self.readOnlyAttr.SetReadOnly(True)
+        self.readOnlyAttr.SetBackgroundColour(wx.SystemSettings.GetColour(wx.SYS_COLOUR_BTNFACE))
+        self.valueAttr = wx.grid.GridCellAttr()
+        self.invalidAttr = wx.grid.GridCellAttr()
+        self.invalidAttr.SetBackgroundColour(wx.Colour(*INVALID_COLOUR))
+        # (row, text, result) of the latest live validation of the value being edited, see ConfigPanel.OnEditorValidated
+        self.knownResult = None
+
+    def ShowRows(self, rowCount):
+        """Show the model's rows up to rowCount, notifying the grid (if attached) of the rows appended since the last call"""
+        appended = rowCount - self.rowCount
+        if appended <= 0:
+            return
+        self.rowCount = rowCount
+        if self.GetView():
+            message = wx.grid.GridTableMessage(self, wx.grid.GRIDTABLE_NOTIFY_ROWS_APPENDED, appended)
+            self.GetView().ProcessTableMessage(message)
+
+    def GetNumberRows(self):
+        return self.rowCount
+
+    def GetNumberCols(self):
+        return len(self.COLUMN_LABELS)
+
+    def IsEmptyCell(self, row, col):
+        return not self.GetValue(row, col)
+
+    def GetValue(self, row, col):
+        if col == self.VALUE_COLUMN:
+            return self.model.values[row]
+        if col == self.NAME_COLUMN:
+            return self.model.names[row]
+        return self.model.datatypes[row]
+
+    def SetValue(self, row, col, value):
+        if col == self.VALUE_COLUMN:
+            # reuse the result of validating the text while it was typed, rather than validating it again
+            knownResult, self.knownResult = self.knownResult, None
+            result = knownResult[2] if knownResult and knownResult[:2] == (row, value) else None
+            self.model.SetValue(row, value, result)
+
+    def GetColLabelValue(self, col):
+        return self.COLUMN_LABELS[col]
+
+    def GetRowLabelValue(self, row):
+        return str(row + 1)
+
+    def GetAttr(self, row, col, kind):
+        if col != self.VALUE_COLUMN:
+            attr = self.readOnlyAttr
+        elif self.model.validity.IsValid(row):
+            attr = self.valueAttr
+        else:
+            attr = self.invalidAttr
+        # the grid releases a reference to the attribute after each use
+        attr.IncRef()
+        return attr
+
+    def GetDatatype(self, row):
+        return self.model.datatypes[row]
+
+    def GetDescription(self, row):
+        description = self.model.GetDescription(row) or self.NO_DESCRIPTION
+        constraints = self.model.constraints.get(row)
+        if constraints is not None:
+            description += f"\n\nAllowed: {validation.DescribeConstraints(constraints)}"
+        return description
+
+    def GetConstraints(self, row):
+        """
+        Returns:
+            (tuple) the row's constraint texts (see PropertyRecord), or None
+        """
+        return self.model.constraints.get(row)
+
+    def GetProperty(self, name):
+        """See ConfigModel.GetProperty"""
+        return self.model.GetProperty(name)
+
+    def SetPropertyValue(self, name, value):
+        """See ConfigModel.SetPropertyValue, also repainting the grid to show the new value"""
+        result = self.model.SetPropertyValue(name, value)
+        if self.GetView():
+            self.GetView().ForceRefresh()
+        return result
+
+
+class DiffListCtrl(wx.ListCtrl):
+    """Virtual list of the changes between two configs, one row per property, with each side's datatype and value"""
+
+    CHANGE_COLOURS = {diff.ADDED: wx.Colour(210, 245, 210), diff.REMOVED: wx.Colour(255, 210, 210), diff.CHANGED: wx.Colour(255, 245, 200)}
+
+    def __init__(self, parent, changes, leftTitle, rightTitle):
+        super().__init__(parent, style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_HRULES | wx.LC_VRULES)
+        self.changes = changes
+        columns = (("Property Name", 220), ("Change", 110), (f"{leftTitle} Type", 90), (f"{leftTitle} Value", 160), (f"{rightTitle} Type", 90), (f"{rightTitle} Value", 160))
+        for column, (label, width) in enumerate(columns):
+            self.InsertColumn(column, label, width=width)
+        self.changeAttrs = {}
+        for kind, colour in self.CHANGE_COLOURS.items():
+            self.changeAttrs[kind] = wx.ItemAttr()
+            self.changeAttrs[kind].SetBackgroundColour(colour)
+        self.SetItemCount(len(changes))
+
+    def OnGetItemText(self, item, column):
+        change = self.changes[item]
+        if column == 0:
+            return change.name
+        if column == 1:
+            return ", ".join(change.fields) if change.kind == diff.CHANGED else change.kind
+        record = change.old if column < 4 else change.new
+        if record is None:
+            return ""
+        return record.datatype if column % 2 == 0 else record.value
+
+    def OnGetItemAttr(self, item):
+        return self.changeAttrs[self.changes[item].kind]
+
+
+class DiffDialog(wx.Dialog):
+    """
+    Side by side view of the differences between the loaded config (left) and another file (right)
+    Modeless, so the grid can still be edited; activating a row that exists on the left selects it in the grid
+    """
+
+    def __init__(self, parent, changes, leftTitle, rightTitle, onSelectRow=None):
+        super().__init__(parent, title=f"Compare {leftTitle} with {rightTitle}", size=(900, 500), style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER)
+        self.changes = changes
+        self.onSelectRow = onSelectRow
+
+        summary = diff.SummarizeChanges(changes)
+        if changes:
+            label = f"{summary[diff.ADDED]} added, {summary[diff.REMOVED]} removed and {summary[diff.CHANGED]} changed properties ({leftTitle} -> {rightTitle})"
+        else:
+            label = f"{leftTitle} and {rightTitle} have the same properties"
+        summaryText = wx.StaticText(self, label=label)
+        self.changeList = DiffListCtrl(self, changes, leftTitle, rightTitle)
+        self.changeList.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.OnActivateChange)
+        closeButton = wx.Button(self, wx.ID_CLOSE)
+        closeButton.Bind(wx.EVT_BUTTON, self.OnCloseButton)
+        self.Bind(wx.EVT_CLOSE, self.OnCloseButton)
+
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(summaryText, 0, wx.ALL, 6)
+        sizer.Add(self.changeList, 1, wx.EXPAND | wx.LEFT | wx.RIGHT, 6)
+        sizer.Add(closeButton, 0, wx.ALIGN_RIGHT | wx.ALL, 6)
+        self.SetSizer(sizer)
+        profiling.Count("widgets.created", CountWidgets(self))
+
+    def OnActivateChange(self, event):
+        """Select the activated property in the grid, if it exists in the loaded config"""
+        old = self.changes[event.GetIndex()].old
+        if old is not None and self.onSelectRow:
+            self.onSelectRow(old.position)
+
+    def OnCloseButton(self, event):
+        self.Destroy()
+
+
+def CountWidgets(window):
+    """
+    Returns:
+        (int) the number of windows in the tree under (and including) the given window
+    """
+    return 1 + sum(CountWidgets(child) for child in window.GetChildren())
+
+
+class MIPIProfilingApp(wx.App):
+    """
+    wx.App that counts every event it dispatches, by event class
+    Only used with --profile, since FilterEvent is called for every event
+    """
+
+    def FilterEvent(self, event):
+        profiling.Count(f"events.{event.__class__.__name__}")
+        return wx.EventFilter.Event_Skip
+
+
+class ConfigPanel(wx.Panel):
+    """
+    Notebook page for one open config: its own grid over its own table and model, and the state of loading it
+    Each page keeps its grid while hidden, so switching tabs only shows it again rather than rebuilding it
+    """
+
+    def __init__(self, parent, frame):
+        super().__init__(parent)
+        self.frame = frame
+        self.mainGrid = None
+        self.propertyTable = None
+        self.hoveredRow = None
+        self.searchMatches = []
+        self.directoryName = None
+        self.filename = None
+        # last status bar message for this config, restored when its tab is selected again
+        self.statusText = wx.EmptyString
+        # background loading state, see LoadXMLFile
+        self.loadId = 0
+        self.loadCancelEvent = None
+        self.loadingPath = None
+        self.loadStartTime = None
+        self.loadProgress = 0
+        # the table being loaded into; when reloading it is only shown once loaded, see LoadXMLFile
+        self.loadingTable = None
+        # property name -> unsaved value to apply to the reloaded file, see ReloadKeepingEdits
+        self.keptEdits = None
+        # (mtime, size) of the file as last loaded or saved, see CheckForChanges
+        self.loadStat = None
+        self.watchedStat = None
+        # bumped whenever the file is loaded or saved, so a refresh started before that is ignored
+        self.refreshId = 0
+        self.refreshing = False
+        # set if properties were added, removed or moved in the file and the user kept their edits; saving patches
+        # properties by position, so it is refused until the file is loaded again (see ReloadKeepingEdits)
+        self.fileReplaced = False
+        # live validation of the value being edited: results from an older generation are stale and dropped
+        self.validationGeneration = 0
+        self.validationTimer = None
+        self.editorControl = None
+        # open comparisons against this config, which select rows in its grid, see DetachDiffDialogs
+        self.diffDialogs = []
+        self.BuildGrid()
+        profiling.Count("widgets.created", CountWidgets(self))
+
+    def BuildGrid(self):
+        """Constructs the (initially empty) virtual grid, which is created once per tab"""
+
+        self.mainGrid = wx.grid.Grid(self)
+        self.propertyTable = MIPIPropertyTable()
+        self.mainGrid.SetTable(self.propertyTable, takeOwnership=False)
+        self.mainGrid.SetRowLabelSize(60)
+        self.mainGrid.SetColLabelSize(40)
+        self.mainGrid.DisableDragRowSize()
+        self.SetColumnSizes()
+
+        self.mainGrid.Bind(wx.grid.EVT_GRID_CELL_CHANGED, self.OnCellChanged)
+        self.mainGrid.Bind(wx.grid.EVT_GRID_EDITOR_CREATED, self.OnEditorCreated)
+        self.mainGrid.Bind(wx.grid.EVT_GRID_EDITOR_HIDDEN, self.OnEditorHidden)
+        self.mainGrid.GetGridWindow().Bind(wx.EVT_MOTION, self.OnHoverCellWithDescription)
+        self.mainGrid.GetGridWindow().Bind(wx.EVT_LEAVE_WINDOW, self.OnUnhoverCellWithDescription)
+
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(self.mainGrid, 1, wx.EXPAND | wx.ALL, 0)
+        self.SetSizer(sizer)
+
+    def SetColumnSizes(self):
+        """Column sizes are reset whenever the grid's table is replaced"""
+
+        self.mainGrid.SetColSize(MIPIPropertyTable.NAME_COLUMN, 240)
+        self.mainGrid.SetColSize(MIPIPropertyTable.DATATYPE_COLUMN, 140)
+        self.mainGrid.SetColSize(MIPIPropertyTable.VALUE_COLUMN, 140)
+
+    def SetPropertyTable(self, propertyTable):
+        """Swap the table displayed by the grid, keeping a reference since the grid does not own it"""
+
+        self.mainGrid.ClearSelection()
+        self.hoveredRow = None
+        self.searchMatches = []
+        self.propertyTable = propertyTable
+        self.mainGrid.SetTable(self.propertyTable, takeOwnership=False)
+        self.SetColumnSizes()
+        self.mainGrid.ForceRefresh()
+        self.Layout()
+
+    def SetStatusText(self, text):
+        """Remember the status message for this config, and show it if this is the selected tab"""
+
+        self.statusText = text
+        if self.frame.GetCurrentPanel() is self:
+            self.frame.SetStatusText(text)
+
+    def IsLoading(self):
+        return self.loadCancelEvent is not None
+
+    def IsDirty(self):
+        return self.propertyTable.model.IsDirty()
+
+    def GetPath(self):
+        """
+        Returns:
+            (str) absolute path of the loaded (or loading) file, or None
+        """
+        if self.loadingPath:
+            return os.path.abspath(self.loadingPath)
+        if self.filename:
+            return os.path.abspath(os.path.join(self.directoryName, self.filename))
+        return None
+
+    def GetTitle(self):
+        """
+        Returns:
+            (str) the tab label: the file name, marked with * while it has unsaved edits
+        """
+        title = self.filename or os.path.basename(self.loadingPath or "") or "Untitled"
+        return f"*{title}" if self.IsDirty() else title
+
+    def IsReloading(self):
+        return self.loadingTable is not None and self.loadingTable is not self.propertyTable
+
+    def LoadXMLFile(self, filePath, keptEdits=None):
+        """
+        Start streaming the properties of the file into a new table on a background thread
+        A new tab shows rows as each batch arrives. A tab that already holds a config keeps showing it until the file
+        has loaded and validated, so a cancelled or failed reload leaves the config as it was
+        Args:
+            keptEdits: (dict) of property name -> value, applied once the file has loaded, see ReloadKeepingEdits
+        """
+
+        logging.info(f"Starting parse of file: {filePath}")
+
+        self.loadId += 1
+        self.loadCancelEvent = threading.Event()
+        self.loadingPath = filePath
+        self.loadStartTime = time.perf_counter()
+        self.loadProgress = 0
+        self.loadStat = self.StatFile(filePath)
+        self.refreshId += 1
+        self.refreshing = False
+        self.keptEdits = keptEdits
+        configModel = model.ConfigModel(filePath)
+        self.loadingTable = MIPIPropertyTable(configModel)
+        if not self.filename:
+            self.SetPropertyTable(self.loadingTable)
+        self.mainGrid.EnableEditing(False)
+        self.SetStatusText(f"Loading {os.path.basename(filePath)}...")
+
+        worker = threading.Thread(target=self.LoadWorker, args=(self.loadId, configModel, self.loadCancelEvent, self.frame.modelCache), daemon=True)
+        worker.start()
+
+    def LoadWorker(self, loadId, configModel, cancelEvent, modelCache):
+        """
+        Runs on a background thread: parse the file into the model, validating each batch (and hashing the file for
+        the cache as it is read), and post how many rows are ready back to the main thread
+        Widgets must not be touched here, everything is passed back through wx.CallAfter
+        """
+
+        filePath = configModel.sourcePath
+        try:
+            fileKey = cache.StatFileKey(filePath)
+            if modelCache:
+                with profiling.Trace("cache lookup", path=filePath):
+                    cached = configModel.LoadFromCache(modelCache, fileKey)
+                if cached:
+                    if cancelEvent.is_set():
+                        return
+                    if not all(configModel.IsComplete(row) for row in range(len(configModel))):
+                        wx.CallAfter(self.OnLoadFailed, loadId, validation.MISSING_NAME_OR_DATATYPE, f"Error loading {os.path.basename(filePath)}")
+                        return
+                    logging.info(f"Loaded {filePath} from the cache")
+                    wx.CallAfter(self.OnLoadComplete, loadId, True)
+                    return
+
+            with open(filePath, "rb") as xmlFile:
+                reader = cache.HashingReader(xmlFile) if modelCache else xmlFile
+                batches = loader.IterPropertyBatchesWithProgress(reader, fileKey.size)
+                for records, progress in profiling.TraceIterator("parse batch", batches):
+                    if cancelEvent.is_set():
+                        logging.info(f"Load of {filePath} cancelled")
+                        return
+                    if not all(record.name and record.datatype for record in records):
+                        wx.CallAfter(self.OnLoadFailed, loadId, validation.MISSING_NAME_OR_DATATYPE, f"Error loading {os.path.basename(filePath)}")
+                        return
+                    with profiling.Trace("model batch", rows=len(records)):
+                        configModel.AppendRecords(records)
+                    wx.CallAfter(self.OnLoadProgress, loadId, len(configModel), progress)
+                if modelCache:
+                    fileKey = reader.FileKey(fileKey)
+        except ET.ParseError as parseError:
+            errorMessage = f"ParseError occurred while reading XML file {filePath}: {parseError.msg}"
+            logging.debug(errorMessage)
+            wx.CallAfter(self.OnLoadFailed, loadId, errorMessage, "Error")
+            return
+        except OSError as osError:
+            wx.CallAfter(self.OnLoadFailed, loadId, f"Unable to read {filePath}: {osError.strerror}", "Error")
+            return
+
+        # shares the template with any other open config made from it (see model.ShareSchema)
+        configModel.Finish()
+        logging.info(f"File parsing complete")
+        if modelCache:
+            # stored before the load completes, since edits made after it must not be cached
+            with profiling.Trace("cache store", path=filePath):
+                modelCache.Store(fileKey, configModel.GetState(), len(configModel))
+        wx.CallAfter(self.OnLoadComplete, loadId, False)
+
+    def IndexWorker(self, configModel):
+        """Runs on a background thread: build the search index of a loaded config, see model.ConfigModel.BuildIndex"""
+
+        with profiling.Trace("index build", rows=len(configModel)):
+            configModel.BuildIndex()
+
+    def CancelLoad(self):
+        """Stop any load in progress; anything the worker has already posted is then ignored"""
+
+        if not self.loadCancelEvent:
+            return
+        self.loadCancelEvent.set()
+        self.loadId += 1
+        if self.IsReloading():
+            # the config shown no longer matches the file
+            self.fileReplaced = True
+        self.FinishLoad()
+
+    def FinishLoad(self):
+        """Forget the state of the load that just ended"""
+
+        self.loadCancelEvent = None
+        self.loadingPath = None
+        self.loadingTable = None
+        self.keptEdits = None
+        self.mainGrid.EnableEditing(True)
+        self.frame.UpdateMenus()
+
+    def StatFile(self, filePath):
+        """
+        Returns:
+            (tuple) of the file's modification time and size, or None if it cannot be read
+        """
+        try:
+            fileStat = os.stat(filePath)
+        except OSError:
+            return None
+        return fileStat.st_mtime_ns, fileStat.st_size
+
+    def CheckForChanges(self):
+        """
+        Polled by the frame: if the loaded file was changed outside the editor, parse it again on a background thread
+        and diff it against the values loaded from it (see RefreshWorker)
+        """
+
+        if self.IsLoading() or self.refreshing or self.fileReplaced or not self.filename:
+            return
+        filePath = os.path.join(self.directoryName, self.filename)
+        fileStat = self.StatFile(filePath)
+        # a missing file is probably being replaced, so wait for it to come back
+        if fileStat is None or fileStat == self.watchedStat:
+            return
+        self.watchedStat = fileStat
+        self.refreshing = True
+        logging.info(f"{filePath} changed outside the editor, refreshing")
+        configModel = self.propertyTable.model
+        # snapshot the file values here, since they can be edited while the worker runs
+        worker = threading.Thread(target=self.RefreshWorker, args=(self.refreshId, configModel, configModel.GetFileValues(), filePath), daemon=True)
+        worker.start()
+
+    def RefreshWorker(self, refreshId, configModel, fileValues, filePath):
+        """
+        Runs on a background thread: diff the changed file against the values it had when loaded,
+        and post back either the changed values, or that properties were added, removed or moved
+        """
+
+        try:
+            with profiling.Trace("refresh diff", path=filePath):
+                changes = diff.Diff(configModel.IterFileRecords(fileValues), loader.IterProperties(filePath))
+        except (ET.ParseError, OSError) as readError:
+            # most likely caught while the file was being written, the next write will be picked up again
+            logging.info(f"Unable to refresh {filePath}: {readError}")
+            wx.CallAfter(self.OnRefreshComplete, refreshId, {})
+            return
+        fileValues = diff.ValueChanges(changes)
+        if fileValues is None:
+            wx.CallAfter(self.OnFileReplaced, refreshId, filePath, len(changes))
+        else:
+            wx.CallAfter(self.OnRefreshComplete, refreshId, fileValues)
+
+    def StopRefresh(self):
+        """Drop the result of any refresh still running, such as when the tab is closed"""
+
+        self.refreshId += 1
+        self.refreshing = False
+
+    def RefreshRows(self, rows):
+        """Repaint just the given rows of the grid, rather than every visible cell"""
+
+        if len(rows) > REFRESH_ROW_LIMIT:
+            self.mainGrid.ForceRefresh()
+            return
+        lastColumn = self.propertyTable.GetNumberCols() - 1
+        for row in rows:
+            self.mainGrid.RefreshBlock(row, 0, row, lastColumn)
+
+    def SaveXMLFile(self, asNew=False):
+        """
+        Write the values loaded in the input fields to a file
+        Optionally can be written as a new file instead of overwriting the current file
+        Refused while any value is invalid, since invalid edits are kept in the grid (see OnCellChanged)
+        """
+        # commit any edit in progress, so it is included in the validity check
+        self.mainGrid.SaveEditControlValue()
+        isValid, errorMessage = self.ValidateAllInput()
+        if not isValid:
+            messageDialogue = wx.MessageDialog(
+                self,
+                f"Cannot save file with invalid data:\n{self.DescribeInvalidRows()}",
+                "Validation Error",
+                wx.OK,
+            )
+            messageDialogue.ShowModal()
+            messageDialogue.Destroy()
+            self.SetStatusText(f"Cannot save file with invalid data: {errorMessage}")
+            return
+        if self.fileReplaced:
+            # saving patches the file's properties by position, and they have moved
+            messageDialogue = wx.MessageDialog(
+                self,
+                f"{self.filename} was changed outside the editor since it was loaded, so your edits cannot be saved from it. Reload it, and reapply your edits to the properties with the same names? You can then save it.",
+                "Unable to Save",
+                wx.YES_NO | wx.YES_DEFAULT,
+            )
+            reload = messageDialogue.ShowModal() == wx.ID_YES
+            messageDialogue.Destroy()
+            if reload:
+                self.ReloadKeepingEdits()
+            return
+
+        if asNew:
+            fileDialogue = wx.FileDialog(self, "Save As", "", "", "*.xml", wx.FD_SAVE)
+            if fileDialogue.ShowModal() == wx.ID_OK:
+                self.filename = fileDialogue.GetFilename()
+                self.directoryName = fileDialogue.GetDirectory()
+                filePath = os.path.join(self.directoryName, self.filename)
+                self.WriteFile(filePath=filePath)
+            fileDialogue.Destroy()
+        else:
+            filePath = os.path.join(self.directoryName, self.filename)
+            self.WriteFile(filePath=filePath)
+        self.frame.UpdatePanelTitle(self)
+
+    def WriteFile(self, filePath):
+        """
+        Write the edited values to a file, patching only the edited properties of the source XML
+        Log and update status text appropriately
+        """
+        configModel = self.propertyTable.model
+        editCount = len(configModel.GetEdits())
+        logging.info(f"Attempting to save file {self.filename} with {editCount} edited properties")
+        startTime = time.perf_counter()
+        try:
+            with profiling.Trace("write", path=filePath, edits=editCount):
+                configModel.Save(filePath)
+        except (OSError, ET.ParseError, ValueError) as saveError:
+            errorMessage = f"Unable to save {filePath}: {saveError}"
+            logging.debug(errorMessage)
+            messageDialogue = wx.MessageDialog(self, errorMessage, "Error", wx.OK)
+            messageDialogue.ShowModal()
+            messageDialogue.Destroy()
+            self.SetStatusText(errorMessage)
+            return
+        # our own write is not an external change
+        self.refreshId += 1
+        self.refreshing = False
+        self.watchedStat = self.StatFile(filePath)
+        logging.info(f"Save complete")
+        self.SetStatusText(f"Saved {self.filename} ({editCount} edited properties in {time.perf_counter() - startTime:.2f} s)")
+
+    def ValidateAllInput(self):
+        """
+        Checks the validity cache, which is kept up to date as values are loaded and edited, rather than revalidating every field
+        Returns:
+            (bool, str) if all fields have valid input, or the first error message if not
+        """
+        return self.propertyTable.model.validity.FirstError()
+
+    def DescribeInvalidRows(self, configModel=None, limit=20):
+        """
+        Args:
+            configModel: the config to describe, the one shown by default
+        Returns:
+            (str) one line per invalid property (up to the limit), to show every error at once
+        """
+        if configModel is None:
+            configModel = self.propertyTable.model
+        invalidRows = configModel.validity.InvalidRows()
+        lines = [f"Row {row + 1} ({configModel.names[row]}): {errorMessage}" for row, errorMessage in invalidRows[:limit]]
+        if len(invalidRows) > limit:
+            lines.append(f"...and {len(invalidRows) - limit} more")
+        return "\n".join(lines)
+
+    def Search(self, query):
+        """Search as the user types, jumping to the first match at or below the current row"""
+
+        propertyIndex = self.propertyTable.model.propertyIndex
+        # a config is only indexed once it has loaded
+        with profiling.Trace("search", query=query):
+            self.searchMatches = propertyIndex.Search(query) if query and propertyIndex else []
+        self.JumpToSearchMatch(query, max(self.mainGrid.GetGridCursorRow(), 0))
+
+    def JumpToSearchMatch(self, query, fromRow):
+        """Select the first search match at or after fromRow (wrapping), and show the match count in the status bar"""
+
+        if not query:
+            self.SetStatusText(wx.EmptyString)
+            return
+        if not self.searchMatches:
+            self.SetStatusText(f"No properties match '{query}'")
+            return
+
+        matchIndex = bisect.bisect_left(self.searchMatches, fromRow) % len(self.searchMatches)
+        self.SelectRow(self.searchMatches[matchIndex])
+        self.SetStatusText(f"Match {matchIndex + 1} of {len(self.searchMatches)} for '{query}'")
+
+    def CompareWithFile(self, otherPath):
+        """Diff the loaded config against otherPath on a background thread, so the editor stays responsive"""
+
+        configModel = self.propertyTable.model
+        # snapshot the rows here, since they can be edited while the worker runs
+        records = [configModel.GetRecord(row) for row in range(len(configModel))]
+        self.SetStatusText(f"Comparing {self.filename} with {os.path.basename(otherPath)}...")
+        worker = threading.Thread(target=self.CompareWorker, args=(self.filename, records, otherPath), daemon=True)
+        worker.start()
+
+    def CompareWorker(self, filename, records, otherPath):
+        """Runs on a background thread: stream the other file past the snapshot, and post the changes back"""
+
+        try:
+            with profiling.Trace("diff", path=otherPath):
+                changes = diff.Diff(records, loader.IterProperties(otherPath))
+        except ET.ParseError as parseError:
+            wx.CallAfter(self.ShowCompareError, f"ParseError occurred while reading XML file {otherPath}: {parseError.msg}")
+            return
+        except OSError as osError:
+            wx.CallAfter(self.ShowCompareError, f"Unable to read {otherPath}: {osError.strerror}")
+            return
+        wx.CallAfter(self.OnCompareComplete, filename, otherPath, changes)
+
+    def ExportFile(self, outputPath, exportFormat, byteOrder):
+        """Export the config (including unsaved edits) on a background thread, streaming straight from the model"""
+
+        self.mainGrid.SaveEditControlValue()
+        self.SetStatusText(f"Exporting {self.filename} to {os.path.basename(outputPath)}...")
+        worker = threading.Thread(target=self.ExportWorker, args=(self.propertyTable.model, outputPath, exportFormat, byteOrder), daemon=True)
+        worker.start()
+
+    def ExportWorker(self, configModel, outputPath, exportFormat, byteOrder):
+        """Runs on a background thread: write the export, and post the result back"""
+
+        startTime = time.perf_counter()
+        try:
+            with profiling.Trace("export", path=outputPath, format=exportFormat):
+                count = export.Export(configModel.IterRecords(), outputPath, exportFormat, byteOrder, getDecoded=configModel.PeekDecoded)
+        except (OSError, ValueError) as exportError:
+            wx.CallAfter(self.ShowExportError, f"Unable to export to {outputPath}: {exportError}")
+            return
+        wx.CallAfter(self.OnExportComplete, f"Exported {count} properties to {os.path.basename(outputPath)} in {time.perf_counter() - startTime:.2f} s")
+
+    def OnExportComplete(self, statusText):
+        """Posted by ExportWorker once the export has been written"""
+
+        # the tab may have been closed while the worker ran
+        if not self:
+            return
+        self.SetStatusText(statusText)
+
+    def ShowExportError(self, errorMessage):
+        if not self:
+            logging.warning(errorMessage)
+            return
+        errorDialogue = wx.MessageDialog(self, errorMessage, "Error", wx.OK)
+        errorDialogue.ShowModal()
+        errorDialogue.Destroy()
+        self.SetStatusText(errorMessage)
+
+    def SelectRow(self, row):
+        """Scroll to and select a row of the grid, if it is still loaded"""
+
+        if row < self.propertyTable.GetNumberRows():
+            self.mainGrid.GoToCell(row, MIPIPropertyTable.VALUE_COLUMN)
+            self.mainGrid.SelectRow(row)
+
+    ### Events
+
+    def OnLoadProgress(self, loadId, rowCount, progress):
+        """Posted by LoadWorker for each parsed batch: show the new rows and update the progress gauge"""
+
+        if loadId != self.loadId:
+            return
+        with profiling.Trace("grid append", rows=rowCount):
+            self.loadingTable.ShowRows(rowCount)
+        self.loadProgress = int(progress * 100)
+        self.frame.UpdateProgress(self)
+        self.SetStatusText(f"Loading {os.path.basename(self.loadingPath)}... {self.loadingTable.GetNumberRows()} properties")
+
+    def OnLoadComplete(self, loadId, fromCache):
+        """
+        Posted by LoadWorker once the whole file has been parsed and validated
+        A file with invalid data is not kept: a new tab is closed, and a reloaded one keeps the config it showed
+        """
+
+        if loadId != self.loadId:
+            return
+        propertyTable = self.loadingTable
+        keptEdits = self.keptEdits
+        reloading = self.IsReloading()
+        filePath = self.loadingPath
+        loadStat = self.loadStat
+        self.FinishLoad()
+        configModel = propertyTable.model
+        propertyTable.ShowRows(len(configModel))
+        elapsed = time.perf_counter() - self.loadStartTime
+        profiling.Count("properties.loaded", propertyTable.GetNumberRows())
+
+        validity = configModel.validity
+        isValid, errorMessage = validity.FirstError()
+        if not isValid:
+            messageDialogue = wx.MessageDialog(
+                self,
+                f"Loaded file has {validity.InvalidCount()} invalid properties:\n{self.DescribeInvalidRows(configModel)}",
+                "Validation Error",
+                wx.OK,
+            )
+            messageDialogue.ShowModal()
+            messageDialogue.Destroy()
+            if reloading:
+                self.fileReplaced = True
+                self.SetStatusText(f"Error reloading {self.filename}, kept the config as it was; {errorMessage}")
+            else:
+                self.frame.ClosePanel(self, f"Error loading {os.path.basename(filePath)}; {errorMessage}")
+            return
+
+        self.directoryName, self.filename = os.path.split(filePath)
+        self.watchedStat = loadStat
+        self.fileReplaced = False
+        if reloading:
+            # rows moved, so comparisons made against the old config would select the wrong ones
+            self.DetachDiffDialogs()
+            self.SetPropertyTable(propertyTable)
+        self.searchMatches = []
+        source = ", from cache" if fromCache else ""
+        self.SetStatusText(f"Loaded file {self.filename} ({propertyTable.GetNumberRows()} properties in {elapsed:.2f} s{source})")
+        if keptEdits:
+            self.ReapplyEdits(keptEdits)
+        self.frame.UpdatePanelTitle(self)
+        # off the load path, so the grid is editable first; a search made before it is done waits for it
+        worker = threading.Thread(target=self.IndexWorker, args=(configModel,), daemon=True)
+        worker.start()
+
+    def OnLoadFailed(self, loadId, errorMessage, title):
+        """Posted by LoadWorker if the file could not be parsed: notify the user and close a new tab, or keep the config a reloaded tab showed"""
+
+        if loadId != self.loadId:
+            return
+        filename = os.path.basename(self.loadingPath)
+        reloading = self.IsReloading()
+        self.FinishLoad()
+        errorDialogue = wx.MessageDialog(self, errorMessage, title, wx.OK)
+        errorDialogue.ShowModal()
+        errorDialogue.Destroy()
+        if reloading:
+            self.fileReplaced = True
+            self.SetStatusText(f"Error reloading {filename}, kept the config as it was; {errorMessage}")
+        else:
+            self.frame.ClosePanel(self, f"Error loading {filename}; {errorMessage}")
+
+    def OnRefreshComplete(self, refreshId, fileValues):
+        """
+        Posted by RefreshWorker: take in the values that changed in the file, updating only their rows
+        Edited rows keep the edit, and the user is warned that the file changed under it
+        """
+
+        # the tab may have been closed while the worker ran
+        if not self or refreshId != self.refreshId:
+            return
+        self.refreshing = False
+        if not fileValues:
+            return
+        configModel = self.propertyTable.model
+        with profiling.Trace("refresh rows", rows=len(fileValues)):
+            conflicts = configModel.ReloadValues(fileValues)
+            self.RefreshRows(sorted(fileValues))
+        self.frame.UpdatePanelTitle(self)
+        self.SetStatusText(f"Reloaded {len(fileValues)} values changed in {self.filename} outside the editor")
+        if conflicts:
+            lines = [f"Row {row + 1} ({configModel.names[row]}): kept {configModel.values[row]!r}, file has {configModel.savedValues[row]!r}" for row in conflicts[:20]]
+            if len(conflicts) > 20:
+                lines.append(f"...and {len(conflicts) - 20} more")
+            messageDialogue = wx.MessageDialog(
+                self,
+                f"{self.filename} was changed outside the editor, and {len(conflicts)} of the changed properties have unsaved edits, which were kept:\n" + "\n".join(lines),
+                "File Changed",
+                wx.OK,
+            )
+            messageDialogue.ShowModal()
+            messageDialogue.Destroy()
+
+    def OnFileReplaced(self, refreshId, filePath, changeCount):
+        """
+        Posted by RefreshWorker if properties were added, removed or moved in the file: load it again,
+        asking first what to do with any unsaved edits
+        """
+
+        # the tab may have been closed while the worker ran
+        if not self or refreshId != self.refreshId:
+            return
+        self.refreshing = False
+        if not self.IsDirty():
+            self.LoadXMLFile(filePath)
+            self.frame.UpdateMenus()
+            return
+        self.mainGrid.SaveEditControlValue()
+        messageDialogue = wx.MessageDialog(
+            self,
+            f"{self.filename} was changed outside the editor ({changeCount} properties differ). Reload it, and reapply your unsaved edits to the properties with the same names?",
+            "File Changed",
+            wx.YES_NO | wx.CANCEL | wx.YES_DEFAULT,
+        )
+        messageDialogue.SetYesNoCancelLabels("&Reload and Reapply Edits", "Reload and &Discard Edits", "&Keep Editing")
+        choice = messageDialogue.ShowModal()
+        messageDialogue.Destroy()
+        if choice == wx.ID_YES:
+            self.ReloadKeepingEdits()
+        elif choice == wx.ID_NO:
+            self.LoadXMLFile(filePath)
+            self.frame.UpdateMenus()
+        else:
+            self.fileReplaced = True
+            self.SetStatusText(f"{self.filename} was changed outside the editor; reload it, reapplying your edits, before saving")
+
+    def ReloadKeepingEdits(self):
+        """
+        Load the file again, then apply the unsaved edits to the properties with the same names (see ReapplyEdits)
+        Used once properties were added, removed or moved in the file, since edits are saved by position
+        """
+
+        configModel = self.propertyTable.model
+        keptEdits = {configModel.names[row]: value for row, value in configModel.GetEdits().items()}
+        self.LoadXMLFile(os.path.join(self.directoryName, self.filename), keptEdits)
+        self.frame.UpdateMenus()
+
+    def ReapplyEdits(self, keptEdits):
+        """Apply edits kept from before a reload, listing any whose property is no longer in the file"""
+
+        configModel = self.propertyTable.model
+        missing = []
+        for name, value in keptEdits.items():
+            try:
+                configModel.SetPropertyValue(name, value)
+            except KeyError:
+                missing.append(name)
+        self.mainGrid.ForceRefresh()
+        self.SetStatusText(f"Reloaded {self.filename} and reapplied {len(keptEdits) - len(missing)} of {len(keptEdits)} unsaved edits")
+        if missing:
+            lines = missing[:20]
+            if len(missing) > 20:
+                lines.append(f"...and {len(missing) - 20} more")
+            messageDialogue = wx.MessageDialog(
+                self,
+                f"{len(missing)} edited properties are no longer in {self.filename}, so their edits were dropped:\n" + "\n".join(lines),
+                "File Changed",
+                wx.OK,
+            )
+            messageDialogue.ShowModal()
+            messageDialogue.Destroy()
+
+    def OnCompareComplete(self, filename, otherPath, changes):
+        """Posted by CompareWorker: show the differences"""
+
+        # the tab may have been closed while the worker ran
+        if not self:
+            return
+        self.SetStatusText(f"{len(changes)} properties differ between {filename} and {os.path.basename(otherPath)}")
+        diffDialogue = DiffDialog(self.frame, changes, filename, os.path.basename(otherPath), onSelectRow=self.SelectRow)
+        self.diffDialogs = [dialog for dialog in self.diffDialogs if dialog]
+        self.diffDialogs.append(diffDialogue)
+        diffDialogue.Show()
+
+    def DetachDiffDialogs(self):
+        """Stop open comparisons from selecting rows in this tab's grid, once the tab is closed"""
+
+        for dialog in self.diffDialogs:
+            if dialog:
+                dialog.onSelectRow = None
+        self.diffDialogs = []
+
+    def ShowCompareError(self, errorMessage):
+        if not self:
+            logging.warning(errorMessage)
+            return
+        errorDialogue = wx.MessageDialog(self, errorMessage, "Error", wx.OK)
+        errorDialogue.ShowModal()
+        errorDialogue.Destroy()
+        self.SetStatusText(errorMessage)
+
+    def OnHoverCellWithDescription(self, event):
+        """Display the description of the Property under the mouse on the box to the right of the grid"""
+
+        x, y = self.mainGrid.CalcUnscrolledPosition(event.GetPosition())
+        row = self.mainGrid.YToRow(y)
+        if row == wx.NOT_FOUND:
+            self.frame.ShowDescription(wx.EmptyString)
+        elif row != self.hoveredRow:
+            logging.debug(f"Event OnHover triggered for row {row}")
+            self.frame.ShowDescription(self.propertyTable.GetDescription(row))
+        self.hoveredRow = row
+        event.Skip()
+
+    def OnUnhoverCellWithDescription(self, event):
+        """Clear out the description on the box to the right of the grid"""
+
+        logging.debug(f"Event OnUnhover triggered for {event.EventObject}")
+
+        self.hoveredRow = None
+        self.frame.ShowDescription(wx.EmptyString)
+        event.Skip()
+
+    def StopLiveValidation(self):
+        """Cancel any pending validation of the value being edited, and drop the results of any still running"""
+
+        self.validationGeneration += 1
+        if self.validationTimer:
+            self.validationTimer.Stop()
+            self.validationTimer = None
+
+    def ValidateEditorText(self, generation, row, text):
+        """
+        Called once the user pauses typing: validate the text, inline if it is short,
+        otherwise on a background thread (see ValidationWorker)
+        """
+
+        if generation != self.validationGeneration:
+            return
+        self.validationTimer = None
+        datatype = self.propertyTable.GetDatatype(row)
+        constraints = self.propertyTable.GetConstraints(row)
+        if len(text) <= INLINE_VALIDATION_LIMIT:
+            self.OnEditorValidated(generation, row, text, validation.ValidateDecoded(text, datatype, constraints))
+            return
+        worker = threading.Thread(target=self.ValidationWorker, args=(generation, row, text, datatype, constraints), daemon=True)
+        worker.start()
+
+    def ValidationWorker(self, generation, row, text, datatype, constraints):
+        """Runs on a background thread: validate a long value, and post the result back"""
+
+        with profiling.Trace("live validation", length=len(text)):
+            result = validation.ValidateDecoded(text, datatype, constraints)
+        wx.CallAfter(self.OnEditorValidated, generation, row, text, result)
+
+    def OnEditorValidated(self, generation, row, text, result):
+        """Show whether the text being edited is valid, by highlighting the editor and in the status bar"""
+
+        if generation != self.validationGeneration:
+            return
+        # committing this exact text then reuses the result, see MIPIPropertyTable.SetValue
+        self.propertyTable.knownResult = (row, text, result)
+        isValid, errorMessage, _ = result
+        if self.editorControl:
+            self.editorControl.SetBackgroundColour(wx.NullColour if isValid else wx.Colour(*INVALID_COLOUR))
+            self.editorControl.Refresh()
+        self.SetStatusText(wx.EmptyString if isValid else f"Row {row + 1}: {errorMessage}")
+
+    def OnEditorCreated(self, event):
+        """Validate the value editor's text as it is typed; the editor is created once and reused for every cell"""
+
+        self.editorControl = event.GetControl()
+        self.editorControl.Bind(wx.EVT_TEXT, self.OnEditorText)
+        event.Skip()
+
+    def OnEditorText(self, event):
+        """
+        Event triggered for every change to the text of the value being edited
+        Validation is debounced, so it only runs once the user pauses, and any result for older text is discarded
+        """
+
+        self.validationGeneration += 1
+        row = self.mainGrid.GetGridCursorRow()
+        text = event.GetString()
+        if self.validationTimer and self.validationTimer.IsRunning():
+            self.validationTimer.Restart(VALIDATION_DELAY_MS, self.validationGeneration, row, text)
+        else:
+            self.validationTimer = wx.CallLater(VALIDATION_DELAY_MS, self.ValidateEditorText, self.validationGeneration, row, text)
+        event.Skip()
+
+    def OnEditorHidden(self, event):
+        """Stop validating once editing ends, and clear the editor's highlighting for the next cell"""
+
+        self.StopLiveValidation()
+        if self.editorControl:
+            self.editorControl.SetBackgroundColour(wx.NullColour)
+        event.Skip()
+
+    def OnCellChanged(self, event):
+        """
+        Event triggered once an edited value has been stored, valid or not: an invalid value is highlighted
+        in the grid and reported in the status bar, and saving is refused until it is fixed
+        Also marks the tab as edited (or not, if the edit restored the saved value)
+        """
+
+        row = event.GetRow()
+        errorMessage = self.propertyTable.model.validity.GetError(row)
+        self.SetStatusText(f"Row {row + 1}: {errorMessage}" if errorMessage else wx.EmptyString)
+        self.frame.UpdatePanelTitle(self)
+        event.Skip()
+
+
+class MIPIConfigFrame(wx.Frame):
+    """
+    wx.Frame that houses various wx components to display information about loaded xml configs
+    Each open config has its own tab (see ConfigPanel); the menus, search box and description box act on the selected one
+    """
+
+    def __init__(self, *args, modelCache=None, **kw):
+        super().__init__(*args, **kw)
+        # parsed models of recently opened files, or None to always parse
+        self.modelCache = modelCache
+        self.notebook = None
+        self.descriptionBox = None
+        self.searchBox = None
+        self.horizontalSizer = None
+        # polls every open file for external changes, see ConfigPanel.CheckForChanges
+        self.watchTimer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.OnWatchTimer, self.watchTimer)
+        self.Build()
+        self.watchTimer.Start(WATCH_INTERVAL_MS)
+        profiling.Count("widgets.created", CountWidgets(self))
+
+    def Build(self):
+        """Create each of the components that live in the Frame"""
+
+        self.BuildMenu()
+        self.BuildStatusBar()
+        self.BuildGridWindow()
+        self.UpdateMenus()
+
+    def BuildMenu(self):
+        """
+        Constructs the top menu bar that allows for user actions,
+        and binds those actions to corresponding events
+        """
+
+        fileMenu= wx.Menu()
+
+        openMenuItem = fileMenu.Append(wx.ID_OPEN, "&Open\tCtrl+O"," Open a config file in a new tab")
+        saveMenuItem = fileMenu.Append(wx.ID_SAVE, "&Save\tCtrl+S"," Save the config file")
+        saveAsMenuItem = fileMenu.Append(wx.ID_SAVEAS, "Save As\tCtrl+Shift+S"," Save as a new config file")
+        compareMenuItem = fileMenu.Append(wx.ID_ANY, "Co&mpare With...\tCtrl+D"," Compare the config with another file, property by property")
+        exportMenuItem = fileMenu.Append(wx.ID_ANY, "&Export...\tCtrl+E"," Export the config as JSON lines, CSV or a binary register image")
+        cancelLoadMenuItem = fileMenu.Append(wx.ID_STOP, "&Cancel Loading"," Stop loading the config file (Esc)")
+        closeTabMenuItem = fileMenu.Append(wx.ID_CLOSE, "Close &Tab\tCtrl+W"," Close the selected config")
+        fileMenu.AppendSeparator()
+        aboutMenuItem = fileMenu.Append(wx.ID_ABOUT, "&About"," Information about this program")
+        exitMenuItem = fileMenu.Append(wx.ID_EXIT,"E&xit"," Terminate the program")
+
+        editMenu = wx.Menu()
+        findMenuItem = editMenu.Append(wx.ID_FIND, "&Find\tCtrl+F", " Search property names and descriptions")
+
+        menuBar = wx.MenuBar()
+        menuBar.Append(fileMenu,"&File")
+        menuBar.Append(editMenu, "&Edit")
+        self.SetMenuBar(menuBar)
+
+        self.Bind(wx.EVT_MENU, self.OnOpen, openMenuItem)
+        self.Bind(wx.EVT_MENU, self.OnSave, saveMenuItem)
+        self.Bind(wx.EVT_MENU, self.OnSaveAs, saveAsMenuItem)
+        self.Bind(wx.EVT_MENU, self.OnCompare, compareMenuItem)
+        self.Bind(wx.EVT_MENU, self.OnExport, exportMenuItem)
+        self.Bind(wx.EVT_MENU, self.OnCancelLoad, cancelLoadMenuItem)
+        self.Bind(wx.EVT_MENU, self.OnCloseTab, closeTabMenuItem)
+        self.Bind(wx.EVT_MENU, self.OnFind, findMenuItem)
+        self.Bind(wx.EVT_MENU, self.OnAbout, aboutMenuItem)
+        self.Bind(wx.EVT_MENU, self.OnExit, exitMenuItem)
+        self.Bind(wx.EVT_CLOSE, self.OnClose)
+        # Esc cancels a load, but is not a menu accelerator, since the grid editor, search box and dialogs need it otherwise
+        self.Bind(wx.EVT_CHAR_HOOK, self.OnCharHook)
+
+        # toggled as tabs are selected and load, see UpdateMenus
+        self.saveMenuItem = saveMenuItem
+        self.saveAsMenuItem = saveAsMenuItem
+        self.compareMenuItem = compareMenuItem
+        self.exportMenuItem = exportMenuItem
+        self.cancelLoadMenuItem = cancelLoadMenuItem
+        self.closeTabMenuItem = closeTabMenuItem
+
+    def BuildStatusBar(self):
+        """Constructs the bottom status bar that displays status messages to the user"""
+
+        statusBar = self.CreateStatusBar(2)
+        statusBar.SetStatusWidths([-1, 160])
+        self.SetStatusText("Open a config file to begin")
+
+        # progress gauge in the second field, only shown while the selected tab is loading
+        self.progressGauge = wx.Gauge(statusBar, range=100, style=wx.GA_HORIZONTAL | wx.GA_SMOOTH)
+        self.progressGauge.Hide()
+        statusBar.Bind(wx.EVT_SIZE, self.OnStatusBarSize)
+
+    def BuildGridWindow(self):
+        """
+        Constructs the search box, the notebook that holds a tab per open config (see ConfigPanel),
+        and the description box to their right
+        """
+
+        # search box above the tabs, jumps to matching rows of the selected config as the user types
+        self.searchBox = wx.SearchCtrl(self, style=wx.TE_PROCESS_ENTER)
+        self.searchBox.SetDescriptiveText("Search names and descriptions (3+ characters), or name prefixes")
+        self.searchBox.ShowCancelButton(True)
+        self.searchBox.Bind(wx.EVT_TEXT, self.OnSearchText)
+        self.searchBox.Bind(wx.EVT_TEXT_ENTER, self.OnSearchNext)
+        self.searchBox.Bind(wx.EVT_SEARCHCTRL_SEARCH_BTN, self.OnSearchNext)
+        self.searchBox.Bind(wx.EVT_SEARCHCTRL_CANCEL_BTN, self.OnSearchCancel)
+
+        self.notebook = wx.Notebook(self)
+        self.notebook.Bind(wx.EVT_NOTEBOOK_PAGE_CHANGED, self.OnTabChanged)
+
+        # description box on the right
+        descriptionHeader = wx.TextCtrl(self, value="Description", size=(200, -1), style=wx.TE_READONLY)
+        self.descriptionBox = wx.TextCtrl(self, size=(200, 200), style=wx.TE_MULTILINE | wx.TE_READONLY)
+        self.verticalSizer = wx.BoxSizer(wx.VERTICAL)
+        self.verticalSizer.Add(descriptionHeader)
+        self.verticalSizer.Add(self.descriptionBox)
+
+        self.gridSizer = wx.BoxSizer(wx.VERTICAL)
+        self.gridSizer.Add(self.searchBox, 0, wx.EXPAND | wx.BOTTOM, 2)
+        self.gridSizer.Add(self.notebook, 1, wx.EXPAND | wx.ALL, 0)
+
+        self.horizontalSizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.horizontalSizer.Add(self.gridSizer, 1, wx.EXPAND | wx.ALL, 0)
+        self.horizontalSizer.Add(self.verticalSizer)
+        self.SetSizer(self.horizontalSizer)
+
+    def GetCurrentPanel(self):
+        """
+        Returns:
+            (ConfigPanel) of the selected tab, or None if no config is open
+        """
+        page = self.notebook.GetCurrentPage() if self.notebook else None
+        return page if isinstance(page, ConfigPanel) else None
+
+    def GetPanels(self):
+        return [self.notebook.GetPage(pageIndex) for pageIndex in range(self.notebook.GetPageCount())]
+
+    def FindPanel(self, filePath):
+        """
+        Returns:
+            (ConfigPanel) the tab already holding the file, or None
+        """
+        filePath = os.path.abspath(filePath)
+        for panel in self.GetPanels():
+            if panel.GetPath() == filePath:
+                return panel
+        return None
+
+    def UpdateMenus(self):
+        """Show the selected tab's progress, and enable only the actions that are safe for it"""
+
+        panel = self.GetCurrentPanel()
+        loading = bool(panel and panel.IsLoading())
+        loaded = bool(panel and panel.filename and not loading)
+        self.progressGauge.SetValue(panel.loadProgress if loading else 0)
+        self.progressGauge.Show(loading)
+        self.PositionProgressGauge()
+        self.cancelLoadMenuItem.Enable(loading)
+        self.saveMenuItem.Enable(loaded)
+        self.saveAsMenuItem.Enable(loaded)
+        self.compareMenuItem.Enable(loaded)
+        self.exportMenuItem.Enable(loaded)
+        self.closeTabMenuItem.Enable(panel is not None)
+
+    def UpdateProgress(self, panel):
+        """Show a loading tab's progress, if it is the selected one"""
+
+        if panel is self.GetCurrentPanel():
+            self.progressGauge.SetValue(panel.loadProgress)
+
+    def UpdatePanelTitle(self, panel):
+        pageIndex = self.notebook.FindPage(panel)
+        if pageIndex != wx.NOT_FOUND:
+            self.notebook.SetPageText(pageIndex, panel.GetTitle())
+
+    def PositionProgressGauge(self):
+        """Fit the progress gauge to the second field of the status bar"""
+
+        rect = self.GetStatusBar().GetFieldRect(1)
+        self.progressGauge.SetPosition((rect.x + 2, rect.y + 2))
+        self.progressGauge.SetSize((rect.width - 4, rect.height - 4))
+
+    def ShowDescription(self, description):
+        self.descriptionBox.SetValue(description)
+
+    def OpenFileAndLoadXML(self):
+        """
+        Open the file selection modal, and start streaming the selected file into a new tab
+        A file that is already open is selected rather than loaded again
+        Returns:
+            (bool) if a file was selected
+        """
+
+        fileDialogue = wx.FileDialog(self, "Choose a file", "", "", "*.xml", wx.FD_OPEN)
+        selected = fileDialogue.ShowModal() == wx.ID_OK
+        profiling.Instant("open dialog returned", selected=selected)
+        if selected:
+            self.LoadXMLFile(fileDialogue.GetPath())
+        fileDialogue.Destroy()
+        return selected
+
+    def LoadXMLFile(self, filePath):
+        """Open the file in a new tab, or select its tab if it is already open"""
+
+        panel = self.FindPanel(filePath)
+        if panel is not None:
+            self.notebook.SetSelection(self.notebook.FindPage(panel))
+            return
+        panel = ConfigPanel(self.notebook, self)
+        panel.LoadXMLFile(filePath)
+        self.notebook.AddPage(panel, panel.GetTitle(), select=True)
+        self.SetStatusText(panel.statusText)
+        self.UpdateMenus()
+
+    def ClosePanel(self, panel, statusText=None):
+        """Close a tab, stopping its load if one is in progress; its model is freed with it, and its template once no other tab uses it"""
+
+        panel.CancelLoad()
+        panel.StopLiveValidation()
+        panel.StopRefresh()
+        panel.DetachDiffDialogs()
+        pageIndex = self.notebook.FindPage(panel)
+        if pageIndex != wx.NOT_FOUND:
+            self.notebook.DeletePage(pageIndex)
+        self.descriptionBox.SetValue(wx.EmptyString)
+        current = self.GetCurrentPanel()
+        if statusText is not None:
+            self.SetStatusText(statusText)
+        elif current is not None:
+            self.SetStatusText(current.statusText)
+        else:
+            self.SetStatusText("Open a config file to begin")
+        self.UpdateMenus()
+
+    def ConfirmDiscardEdits(self, panels):
+        """
+        Ask before closing configs with unsaved edits
+        Returns:
+            (bool) if there are no unsaved edits, or the user chose to discard them
+        """
+        dirtyNames = [panel.filename for panel in panels if panel.IsDirty()]
+        if not dirtyNames:
+            return True
+        messageDialogue = wx.MessageDialog(
+            self,
+            f"Discard unsaved edits to {', '.join(dirtyNames)}?",
+            "Unsaved Edits",
+            wx.YES_NO | wx.NO_DEFAULT,
+        )
+        discard = messageDialogue.ShowModal() == wx.ID_YES
+        messageDialogue.Destroy()
+        return discard
+
+    def ShowNoFileMessage(self, message, title):
+        messageDialogue = wx.MessageDialog(self, message, title, wx.OK)
+        messageDialogue.ShowModal()
+        messageDialogue.Destroy()
+        self.SetStatusText("Open a config file to begin")
+
+    ### Events
+
+    def OnOpen(self, event):
+        """
+        Prompt the user to select an XML file, and start loading it into a new tab
+        Triggered when the app is initially run, or from the 'Open' menu option
+        """
+
+        self.OpenFileAndLoadXML()
+
+    def OnTabChanged(self, event):
+        """Show the status and progress of the newly selected config, and rerun the search against it"""
+
+        panel = self.GetCurrentPanel()
+        self.descriptionBox.SetValue(wx.EmptyString)
+        if panel is not None:
+            self.SetStatusText(panel.statusText)
+            if self.searchBox.GetValue():
+                panel.Search(self.searchBox.GetValue())
+        self.UpdateMenus()
+        event.Skip()
+
+    def OnWatchTimer(self, event):
+        """Check each open file for changes made outside the editor"""
+
+        for panel in self.GetPanels():
+            panel.CheckForChanges()
+
+    def OnCancelLoad(self, event):
+        """
+        Stop the load in progress and close its tab, leaving the other configs in place
+        A cancelled reload keeps the tab, showing the config as it was
+        Triggered from the 'Cancel Loading' menu option, or Esc while loading (see OnCharHook)
+        """
+
+        panel = self.GetCurrentPanel()
+        if panel is None or not panel.IsLoading():
+            return
+        filename = os.path.basename(panel.loadingPath)
+        if panel.IsReloading():
+            panel.CancelLoad()
+            panel.SetStatusText(f"Cancelled reloading {filename}, kept the config as it was")
+        else:
+            self.ClosePanel(panel, f"Cancelled loading {filename}")
+
+    def OnCharHook(self, event):
+        """Cancel the selected tab's load on Esc, passing the key on as usual when nothing is loading"""
+
+        panel = self.GetCurrentPanel()
+        if event.GetKeyCode() == wx.WXK_ESCAPE and panel is not None and panel.IsLoading():
+            self.OnCancelLoad(event)
+            return
+        event.Skip()
+
+    def OnCloseTab(self, event):
+        """
+        Close the selected config, asking first if it has unsaved edits
+        Triggered from the 'Close Tab' menu option
+        """
+
+        panel = self.GetCurrentPanel()
+        if panel is not None and self.ConfirmDiscardEdits([panel]):
+            self.ClosePanel(panel)
+
+    def OnFind(self, event):
+        """
+        Move focus to the search box
+        Triggered from the 'Find' menu option
+        """
+
+        self.searchBox.SetFocus()
+        self.searchBox.SelectAll()
+
+    def OnSearchText(self, event):
+        """Search the selected config as the user types"""
+
+        panel = self.GetCurrentPanel()
+        if panel is not None:
+            panel.Search(self.searchBox.GetValue())
+
+    def OnSearchNext(self, event):
+        """Jump to the next match below the current row, wrapping around to the top"""
+
+        panel = self.GetCurrentPanel()
+        if panel is not None:
+            panel.JumpToSearchMatch(self.searchBox.GetValue(), panel.mainGrid.GetGridCursorRow() + 1)
+
+    def OnSearchCancel(self, event):
+        """Clear the search box and the matches"""
+
+        self.searchBox.ChangeValue(wx.EmptyString)
+        panel = self.GetCurrentPanel()
+        if panel is not None:
+            panel.searchMatches = []
+            panel.SetStatusText(wx.EmptyString)
+
+    def OnStatusBarSize(self, event):
+        """Keep the progress gauge inside its status bar field"""
+
+        self.PositionProgressGauge()
+        event.Skip()
+
+    def OnSave(self, event):
+        """
+        Save the selected config
+        If there is no file loaded, lets the user know via a dialogue
+        Triggered from the 'Save' menu option
+        """
+
+        panel = self.GetCurrentPanel()
+        if panel is not None and panel.filename:
+            panel.SaveXMLFile()
+        else:
+            self.ShowNoFileMessage("Cannot save without a template. Load a file from File -> Open first", "Unable to Save")
+
+    def OnCompare(self, event):
+        """
+        Compare the selected config (including unsaved edits) with another file, showing the differences side by side
+        Triggered from the 'Compare With' menu option
+        """
+
+        panel = self.GetCurrentPanel()
+        if panel is None or not panel.filename:
+            messageDialogue = wx.MessageDialog(self, "Nothing to compare. Load a file from File -> Open first", "Unable to Compare", wx.OK)
+            messageDialogue.ShowModal()
+            messageDialogue.Destroy()
+            return
+
+        fileDialogue = wx.FileDialog(self, "Choose a file to compare with", panel.directoryName or "", "", "*.xml", wx.FD_OPEN)
+        if fileDialogue.ShowModal() == wx.ID_OK:
+            panel.CompareWithFile(fileDialogue.GetPath())
+        fileDialogue.Destroy()
+
+    def OnExport(self, event):
+        """
+        Export the selected config (including unsaved edits) in the format chosen in the save dialog
+        Triggered from the 'Export' menu option
+        """
+
+        panel = self.GetCurrentPanel()
+        if panel is None or not panel.filename:
+            self.ShowNoFileMessage("Nothing to export. Load a file from File -> Open first", "Unable to Export")
+            return
+
+        wildcard = "|".join(f"{label} (*.{extension})|*.{extension}" for label, extension, _, _ in EXPORT_CHOICES)
+        defaultName = f"{os.path.splitext(panel.filename)[0]}.{EXPORT_CHOICES[0][1]}"
+        fileDialogue = wx.FileDialog(self, "Export", panel.directoryName or "", defaultName, wildcard, wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT)
+        if fileDialogue.ShowModal() == wx.ID_OK:
+            _, _, exportFormat, byteOrder = EXPORT_CHOICES[fileDialogue.GetFilterIndex()]
+            panel.ExportFile(fileDialogue.GetPath(), exportFormat, byteOrder)
+        fileDialogue.Destroy()
+
+    def OnSaveAs(self, event):
+        """
+        Save the selected config as a new file
+        If there is no file loaded, lets the user know via a dialogue
+        Triggered from the 'Save' menu option
+        """
+
+        panel = self.GetCurrentPanel()
+        if panel is not None and panel.filename:
+            panel.SaveXMLFile(asNew=True)
+        else:
+            self.ShowNoFileMessage("Cannot save without a template. Load a file from File -> Open first", "Unable to Save")
+
+    def OnAbout(self, event):
+        """
+        Display a message dialog box with some info about the app
+        Triggered from the 'About' menu option
+        """
+
+        messageDialogue = wx.MessageDialog(self, "MIPI coding sample test by Keith Carriere", "About MIPI configuration editor", wx.OK)
+        messageDialogue.ShowModal()
+        messageDialogue.Destroy()
+
+    def OnExit(self, event):
+        """
+        Terminate the application
+        Triggered from the 'Exit' menu option
+        """
+
+        self.Close()
+
+    def OnClose(self, event):
+        """Ask before discarding unsaved edits, then stop every background load before the frame is destroyed"""
+
+        panels = self.GetPanels()
+        if event.CanVeto() and not self.ConfirmDiscardEdits(panels):
+            event.Veto()
+            return
+        self.watchTimer.Stop()
+        for panel in panels:
+            panel.CancelLoad()
+        event.Skip()
+
+
+def RunEditor(modelCache=None):
+    """
+    Create the app, the frame, show it, and start the event loop
+    Args:
+        modelCache: cache.ModelCache of parsed files, or None to always parse
+    """
+    app = MIPIProfilingApp() if profiling.enabled else wx.App()
+    frm = MIPIConfigFrame(None, title="MIPI configuration editor", size=(800, 600), modelCache=modelCache)
+    frm.Show()
+    app.MainLoop()
+    return 0
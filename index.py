@@ -0,0 +1,196 @@
+"""
+Lookup index over the properties of a loaded config
+Exact lookups by <Name> and short prefix searches binary search the rows sorted by name; incremental (substring)
+search over names and descriptions goes through trigram posting lists, so only rows sharing the query's rarest
+trigram are checked. Each part is built the first time it is needed (or ahead of that, see Build), not while loading
+"""
+
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import accumulate
+
+TRIGRAM_LENGTH = 3
+# a name trigram found in more than this fraction of the rows (such as one from a prefix every name shares) gets no
+# posting list, since it barely narrows a search but would cost 4 bytes per row
+COMMON_TRIGRAM_RATIO = 0.25
+
+
+def Trigrams(text):
+    """
+    Returns:
+        (set) of every 3 character substring of the (already lower cased) text
+    """
+    return {text[index:index + TRIGRAM_LENGTH] for index in range(len(text) - TRIGRAM_LENGTH + 1)}
+
+
+def ToArray(data):
+    """
+    Returns:
+        (array) of row numbers, from the bytes of an array("I")
+    """
+    rows = array("I")
+    rows.frombytes(data)
+    return rows
+
+
+class PropertyIndex:
+    """
+    Name and description index over the columns of a complete TemplateSchema, which it reads rather than copies
+    Descriptions are indexed by their id in the schema, so a description shared by many properties is only indexed once
+    Safe to use from several threads: each part is built once, under a lock
+    """
+
+    def __init__(self, names, descriptions, descriptionIds):
+        self.names = names
+        self.descriptions = descriptions
+        self.descriptionIds = descriptionIds
+        self.lock = threading.Lock()
+        # rows ordered by lower cased name, then by row, see GetSortedRows
+        self.sortedRows = None
+        # trigram -> rows whose lower cased name contains it, for every trigram but the common ones, see BuildPostings
+        self.nameTrigrams = None
+        self.commonNameTrigrams = None
+        self.lowerDescriptions = None
+        # trigram -> ids of the descriptions containing it
+        self.descriptionTrigrams = None
+        # rows grouped by description id: those with id n are descriptionRows[descriptionStarts[n]:descriptionStarts[n + 1]]
+        self.descriptionRows = None
+        self.descriptionStarts = None
+
+    def Build(self):
+        """Build every part now, such as on a background thread once the config has loaded, rather than on first use"""
+        self.GetSortedRows()
+        self.BuildPostings()
+
+    def LowerName(self, row):
+        return self.names[row].lower()
+
+    def GetSortedRows(self):
+        """
+        Returns:
+            (array) of every row, ordered by lower cased name
+        """
+        if self.sortedRows is None:
+            with self.lock:
+                if self.sortedRows is None:
+                    # sorted is stable, so rows with the same name stay in row order
+                    self.sortedRows = array("I", sorted(range(len(self.names)), key=self.LowerName))
+        return self.sortedRows
+
+    def BuildPostings(self):
+        """Build the trigram posting lists of the names and the descriptions, if not already built"""
+        if self.nameTrigrams is not None:
+            return
+        with self.lock:
+            if self.nameTrigrams is not None:
+                return
+            nameTrigrams = {}
+            for row, name in enumerate(self.names):
+                for trigram in Trigrams(name.lower()):
+                    posting = nameTrigrams.get(trigram)
+                    if posting is None:
+                        posting = nameTrigrams[trigram] = array("I")
+                    posting.append(row)
+            commonLength = len(self.names) * COMMON_TRIGRAM_RATIO
+            commonNameTrigrams = {trigram for trigram, posting in nameTrigrams.items() if len(posting) > commonLength}
+            for trigram in commonNameTrigrams:
+                del nameTrigrams[trigram]
+
+            lowerDescriptions = []
+            descriptionTrigrams = {}
+            for descriptionId, description in enumerate(self.descriptions):
+                lowerDescription = description.lower()
+                if lowerDescription == description:
+                    # share the description's string rather than storing an equal copy
+                    lowerDescription = description
+                lowerDescriptions.append(lowerDescription)
+                for trigram in Trigrams(lowerDescription):
+                    descriptionTrigrams.setdefault(trigram, array("I")).append(descriptionId)
+            rowCounts = Counter(self.descriptionIds)
+            self.descriptionStarts = array("I", accumulate((rowCounts[descriptionId] for descriptionId in range(len(self.descriptions))), initial=0))
+            self.descriptionRows = array("I", sorted(range(len(self.descriptionIds)), key=self.descriptionIds.__getitem__))
+            self.lowerDescriptions = lowerDescriptions
+            self.descriptionTrigrams = descriptionTrigrams
+            self.commonNameTrigrams = commonNameTrigrams
+            # set last, since it marks the postings as built
+            self.nameTrigrams = nameTrigrams
+
+    def FindRow(self, name):
+        """
+        Returns:
+            (int) the first row of the property with exactly the given name, or None
+        """
+        lowerName = name.lower()
+        sortedRows = self.GetSortedRows()
+        for position in range(bisect_left(sortedRows, lowerName, key=self.LowerName), len(sortedRows)):
+            row = sortedRows[position]
+            if self.names[row] == name:
+                return row
+            if self.names[row].lower() != lowerName:
+                break
+        return None
+
+    def Search(self, query):
+        """
+        Find every property whose name or description contains the query, ignoring case
+        Queries shorter than TRIGRAM_LENGTH only match names that start with them, since a substring that short
+        would match nearly every property
+        Returns:
+            (list) of matching rows, in row order
+        """
+        query = query.lower()
+        if not query:
+            return []
+        if len(query) < TRIGRAM_LENGTH:
+            return self.SearchNamePrefix(query)
+
+        self.BuildPostings()
+        names = self.names
+        candidates = self.FindCandidates(query, self.nameTrigrams, self.commonNameTrigrams)
+        if candidates is None:
+            # every trigram of the query is common, so check every name
+            candidates = range(len(names))
+        # name postings are appended in row order, so these are already sorted
+        nameRows = [row for row in candidates if query in names[row].lower()]
+        candidates = self.FindCandidates(query, self.descriptionTrigrams, ())
+        descriptionIds = [descriptionId for descriptionId in candidates if query in self.lowerDescriptions[descriptionId]]
+        if not descriptionIds:
+            return nameRows
+        rows = set(nameRows)
+        for descriptionId in descriptionIds:
+            rows.update(self.descriptionRows[self.descriptionStarts[descriptionId]:self.descriptionStarts[descriptionId + 1]])
+        return sorted(rows)
+
+    def FindCandidates(self, query, postings, commonTrigrams):
+        """
+        Returns:
+            (array) the shortest posting list of the query's trigrams, which holds every id whose text contains it,
+            or None if all the query's trigrams are common (and so have none)
+        """
+        candidates = None
+        for trigram in Trigrams(query):
+            if trigram in commonTrigrams:
+                continue
+            posting = postings.get(trigram)
+            if posting is None:
+                # a trigram that appears nowhere means nothing can match
+                return ()
+            if candidates is None or len(posting) < len(candidates):
+                candidates = posting
+        return candidates
+
+    def SearchNamePrefix(self, prefix):
+        """
+        Returns:
+            (list) of rows whose name starts with the (lower cased) prefix, in row order
+        """
+        sortedRows = self.GetSortedRows()
+        rows = []
+        for position in range(bisect_left(sortedRows, prefix, key=self.LowerName), len(sortedRows)):
+            row = sortedRows[position]
+            if not self.names[row].lower().startswith(prefix):
+                break
+            rows.append(row)
+        return sorted(rows)
@@ -0,0 +1,194 @@
+"""
+Streaming loader for MIPI configuration files
+Parses with iterparse and frees each <Property> element once its record has been read,
+so peak memory is bounded by the records kept rather than the whole ElementTree
+"""
+
+import json
+import os
+import sys
+import xml.etree.ElementTree as ET
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+# position is the index of the <Property> in document order, used to write values back on save
+# constraints is None, or the texts of the optional constraint elements (see CONSTRAINT_TAGS), "" for those not given
+PropertyRecord = namedtuple("PropertyRecord", ("name", "datatype", "value", "description", "position", "constraints"), defaults=(None,))
+
+# optional child elements of a <Property> that restrict its value, see validation.ParseConstraints
+CONSTRAINT_TAGS = ("Min", "Max", "BitWidth", "Count")
+# the elements every <Property> has
+PROPERTY_TAGS = frozenset(("Name", "DataType", "Value", "Description"))
+
+
+def ChildText(element, tag):
+    """
+    Returns:
+        (str) the text of the element's first child with the given tag, or an empty string
+    """
+    child = element.find(tag)
+    if child is None:
+        return ""
+    return child.text or ""
+
+
+def ReadConstraints(element):
+    """
+    Returns:
+        (tuple) of the texts of the property element's constraint children (in CONSTRAINT_TAGS order),
+            or None if none of them has any text; other children (such as <Unit>) are ignored
+    """
+    if all(child.tag in PROPERTY_TAGS for child in element):
+        return None
+    texts = tuple(ChildText(element, tag) for tag in CONSTRAINT_TAGS)
+    if not any(text.strip() for text in texts):
+        return None
+    return texts
+
+
+def IterProperties(source):
+    """
+    Stream the properties of a config file
+    Args:
+        source: a file path or binary file object
+    Yields:
+        (PropertyRecord) for each <Property>, as soon as its closing tag has been parsed
+    Raises ET.ParseError (possibly after some records have been yielded) or OSError
+    """
+    position = 0
+    # elements that have been started but not ended, so a finished <Property> can be removed from its parent
+    openElements = []
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            openElements.append(element)
+            continue
+
+        openElements.pop()
+        if element.tag != "Property":
+            continue
+
+        yield PropertyRecord(
+            ChildText(element, "Name"),
+            ChildText(element, "DataType"),
+            ChildText(element, "Value"),
+            ChildText(element, "Description"),
+            position,
+            ReadConstraints(element),
+        )
+        position += 1
+
+        # every earlier sibling has already ended, so the parent's children can all be dropped
+        if openElements:
+            del openElements[-1][:]
+        else:
+            element.clear()
+
+
+def IterPropertyBatches(source, firstBatchSize=256, batchSize=8192):
+    """
+    Stream the properties of a config file in lists, so callers can update a view per batch rather than per record
+    The first batch is kept small so the first rows can be shown quickly
+    Yields:
+        (list) of PropertyRecord
+    """
+    batch = []
+    limit = firstBatchSize
+    for record in IterProperties(source):
+        batch.append(record)
+        if len(batch) >= limit:
+            yield batch
+            batch = []
+            limit = batchSize
+    if batch:
+        yield batch
+
+
+def IterPropertyBatchesWithProgress(xmlFile, fileSize, **kw):
+    """
+    Stream the properties of an open config file in batches, along with how far through the file the parser has read
+    Args:
+        xmlFile: a binary file object, read from its current position (such as a cache.HashingReader)
+        fileSize: the size of the file in bytes
+    Yields:
+        (list, float) of PropertyRecord, and the fraction (0 to 1) of the file parsed so far
+    """
+    fileSize = fileSize or 1
+    for batch in IterPropertyBatches(xmlFile, **kw):
+        # iterparse reads ahead in chunks, so this is an estimate of progress rather than an exact position
+        yield batch, min(xmlFile.tell() / fileSize, 1.0)
+
+
+def FindConfigFiles(paths):
+    """
+    Expand the given files and directories into a sorted list of .xml config files
+    Directories are walked recursively
+    """
+    configFiles = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directoryName, _, filenames in os.walk(path):
+                configFiles.extend(os.path.join(directoryName, filename) for filename in filenames if filename.lower().endswith(".xml"))
+        else:
+            configFiles.append(path)
+    return sorted(configFiles)
+
+
+def RunPerFile(function, filePaths, workers=None, *args):
+    """
+    Call function(filePath, *args) for each file, fanning out across a process pool unless workers is 1
+    function and args must be picklable, so function has to be defined at module level
+    Yields:
+        the result for each file, in the order given
+    """
+    if workers == 1 or len(filePaths) <= 1:
+        for filePath in filePaths:
+            yield function(filePath, *args)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    # batch several small files per task so pickling overhead doesn't dominate
+    chunksize = max(1, len(filePaths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(function, filePaths, *(repeat(arg) for arg in args), chunksize=chunksize)
+
+
+def SummarizeFile(filePath):
+    """
+    Stream a config file and count its properties
+    Returns:
+        (dict) with the file path and size, the number of properties, the number per datatype,
+            the number with an empty value, and a file level error if it could not be parsed
+    """
+    summary = {"path": filePath, "bytes": 0, "properties": 0, "datatypes": {}, "emptyValues": 0, "error": ""}
+    datatypes = Counter()
+    try:
+        summary["bytes"] = os.path.getsize(filePath)
+        for record in IterProperties(filePath):
+            datatypes[record.datatype] += 1
+            if not record.value:
+                summary["emptyValues"] += 1
+    except ET.ParseError as parseError:
+        summary["error"] = f"ParseError occurred while reading XML file {filePath}: {parseError.msg}"
+    except OSError as osError:
+        summary["error"] = f"Unable to read {filePath}: {osError.strerror}"
+    summary["properties"] = sum(datatypes.values())
+    summary["datatypes"] = dict(datatypes)
+    return summary
+
+
+def RunInfoCommand(paths, output=None):
+    """
+    Summarize the given files and directories, writing one JSON object per file
+    Returns:
+        (int) process exit code, 0 if every file could be read and 1 otherwise
+    """
+    output = output or sys.stdout
+    exitCode = 0
+    for filePath in FindConfigFiles(paths):
+        summary = SummarizeFile(filePath)
+        output.write(json.dumps(summary) + "\n")
+        if summary["error"]:
+            exitCode = 1
+    output.flush()
+    return exitCode
@@ -0,0 +1,484 @@
+"""
+Compact in-memory model of a loaded config, independent of any widgets
+Properties are stored column by column rather than as one object per property. The columns that come from the
+template (names, datatypes, descriptions and constraints) live in a TemplateSchema that every open config made from
+the same template shares, so each config only adds its own values. The grid (see gui.py), validation and save all
+read from these models, so they work the same headless as in the editor.
+"""
+
+import logging
+import sys
+import threading
+import weakref
+from array import array
+
+import cache
+import index
+import loader
+import validation
+import writer
+
+
+class TemplateSchema:
+    """
+    The parts of a config that come from its template: interned property names and datatypes, each distinct
+    description stored once and referenced by id, the constraints, and the name/description index over them
+    Datatypes resolve to the validators shared through validation.GetValidator
+    A schema is only appended to while its first config loads, and is read only once shared (see ShareSchema)
+    """
+
+    __slots__ = (
+        "names",
+        "datatypes",
+        "descriptionIds",
+        "descriptions",
+        "descriptionLookup",
+        "constraints",
+        "propertyIndex",
+        "key",
+        "__weakref__",
+    )
+
+    def __init__(self):
+        self.names = []
+        self.datatypes = []
+        self.descriptionIds = array("I")
+        self.descriptions = []
+        # description -> id, so every property sharing a description points at a single string
+        self.descriptionLookup = {}
+        # row -> constraint texts (see PropertyRecord), only for the few rows that have constraints
+        self.constraints = {}
+        # set once the whole template has been added, see ShareSchema
+        self.propertyIndex = None
+        self.key = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def AppendRecords(self, records):
+        """
+        Add the template columns of a batch of loaded records
+        Returns:
+            (dict) of offset in the batch -> constraint texts, for the records that have constraints
+        """
+        startRow = len(self.names)
+        intern = sys.intern
+        descriptionLookup = self.descriptionLookup
+        descriptions = self.descriptions
+
+        batchConstraints = {}
+        for offset, record in enumerate(records):
+            descriptionId = descriptionLookup.get(record.description)
+            if descriptionId is None:
+                descriptionId = descriptionLookup[record.description] = len(descriptions)
+                descriptions.append(record.description)
+            self.descriptionIds.append(descriptionId)
+            if record.constraints is not None:
+                batchConstraints[offset] = record.constraints
+                self.constraints[startRow + offset] = record.constraints
+        self.datatypes.extend(intern(record.datatype) for record in records)
+        self.names.extend(intern(record.name) for record in records)
+        return batchConstraints
+
+    def GetDescription(self, row):
+        return self.descriptions[self.descriptionIds[row]]
+
+    def IndexColumns(self):
+        """Set up the name/description index over the whole template, which is only built when first used"""
+        self.propertyIndex = index.PropertyIndex(self.names, self.descriptions, self.descriptionIds)
+
+    def Key(self):
+        """
+        Returns:
+            (int) hash of every column, equal for equal schemas, computed once the schema is complete
+        """
+        if self.key is None:
+            self.key = hash((
+                tuple(self.names),
+                tuple(self.datatypes),
+                self.descriptionIds.tobytes(),
+                tuple(self.descriptions),
+                tuple(sorted(self.constraints.items())),
+            ))
+        return self.key
+
+    def Matches(self, other):
+        """
+        Returns:
+            (bool) if the other schema has exactly the same columns
+        """
+        # the strings are interned, so equal columns mostly compare by identity
+        return (
+            self.names == other.names
+            and self.datatypes == other.datatypes
+            and self.descriptionIds == other.descriptionIds
+            and self.descriptions == other.descriptions
+            and self.constraints == other.constraints
+        )
+
+    def GetState(self):
+        """
+        Returns:
+            (dict) of the columns, for ModelCache
+        """
+        return {
+            "names": self.names,
+            "datatypes": self.datatypes,
+            "descriptionIds": self.descriptionIds.tobytes(),
+            "descriptions": self.descriptions,
+            "constraints": self.constraints,
+        }
+
+    @classmethod
+    def FromState(cls, state):
+        """
+        Returns:
+            (TemplateSchema) with the columns of a GetState, not yet indexed (see ShareSchema)
+        Raises ValueError, KeyError or TypeError if the state is inconsistent
+        """
+        schema = cls()
+        names = [sys.intern(name) for name in state["names"]]
+        datatypes = [sys.intern(datatype) for datatype in state["datatypes"]]
+        descriptions = list(state["descriptions"])
+        descriptionIds = index.ToArray(state["descriptionIds"])
+        constraints = {row: tuple(constraintTexts) for row, constraintTexts in state["constraints"].items()}
+        if not len(names) == len(datatypes) == len(descriptionIds):
+            raise ValueError("columns have different lengths")
+        if descriptionIds and max(descriptionIds) >= len(descriptions):
+            raise ValueError("description id out of range")
+        if any(not 0 <= row < len(names) or len(constraintTexts) != len(loader.CONSTRAINT_TAGS) for row, constraintTexts in constraints.items()):
+            raise ValueError("constraints do not match the rows")
+        schema.names = names
+        schema.datatypes = datatypes
+        schema.descriptions = descriptions
+        schema.descriptionIds = descriptionIds
+        schema.descriptionLookup = {description: descriptionId for descriptionId, description in enumerate(descriptions)}
+        schema.constraints = constraints
+        return schema
+
+
+# schemas used by open configs, by Key(); held weakly, so a schema is freed once the last config using it is closed
+_sharedSchemas = weakref.WeakValueDictionary()
+# configs are loaded on background threads
+_sharedSchemasLock = threading.Lock()
+
+
+def ShareSchema(schema):
+    """
+    Swap a newly loaded schema for an equal one already in use, so configs from the same template hold a single copy
+    Otherwise the schema is indexed and shared with configs loaded later
+    Returns:
+        (TemplateSchema) the schema to use
+    """
+    key = schema.Key()
+    with _sharedSchemasLock:
+        shared = _sharedSchemas.get(key)
+    if shared is not None and shared.Matches(schema):
+        return shared
+
+    schema.IndexColumns()
+    with _sharedSchemasLock:
+        shared = _sharedSchemas.get(key)
+        if shared is not None and shared.Matches(schema):
+            # an equal schema finished loading on another thread meanwhile
+            return shared
+        if shared is None:
+            _sharedSchemas[key] = schema
+    return schema
+
+
+class ConfigModel:
+    """
+    The values of one config file on top of its TemplateSchema, plus the state derived from them:
+    which values are invalid, which have been edited, and their decoded forms
+    Rows are in document order, so a row is also the position of its <Property> in the file
+    """
+
+    __slots__ = (
+        "sourcePath",
+        "schema",
+        "values",
+        "decoded",
+        "savedValues",
+        "validity",
+    )
+
+    def __init__(self, sourcePath=None):
+        self.sourcePath = sourcePath
+        self.schema = TemplateSchema()
+        self.values = []
+        # row -> typed value (see validation.Decode), filled in as rows are decoded and dropped when their value changes
+        self.decoded = {}
+        # row -> value in the file, for edited rows only
+        self.savedValues = {}
+        self.validity = validation.ValidityCache()
+
+    def __len__(self):
+        return len(self.values)
+
+    # the template columns, read through the schema
+
+    @property
+    def names(self):
+        return self.schema.names
+
+    @property
+    def datatypes(self):
+        return self.schema.datatypes
+
+    @property
+    def constraints(self):
+        return self.schema.constraints
+
+    @property
+    def propertyIndex(self):
+        return self.schema.propertyIndex
+
+    def BuildIndex(self):
+        """Build the name/description index ahead of the first search, which otherwise builds it (see index.PropertyIndex)"""
+        self.schema.propertyIndex.Build()
+
+    def AppendRecords(self, records):
+        """
+        Add a batch of loaded records: store them compactly, then validate them
+        Safe to call from a loading thread while another thread reads the rows that were already added
+        """
+        startRow = len(self.values)
+        batchConstraints = self.schema.AppendRecords(records)
+        batchValues = [record.value for record in records]
+        self.validity.ValidateRows(startRow, batchValues, self.schema.datatypes[startRow:], batchConstraints)
+        # the value column is extended last, since its length is the number of rows that are ready to be read
+        self.values.extend(batchValues)
+
+    def Finish(self):
+        """Called once the whole file has been added: share the schema with other configs from the same template"""
+        self.schema = ShareSchema(self.schema)
+
+    def GetState(self):
+        """
+        Returns:
+            (dict) of the columns as they are in the file (ignoring any edits), for ModelCache
+        """
+        return {**self.schema.GetState(), "values": self.GetFileValues()}
+
+    def GetFileValues(self):
+        """
+        Returns:
+            (list) of every value as it is in the file, ignoring any edits
+        """
+        values = list(self.values)
+        for row, savedValue in list(self.savedValues.items()):
+            values[row] = savedValue
+        return values
+
+    def IterFileRecords(self, fileValues):
+        """
+        Yields:
+            (PropertyRecord) for each row, holding the value from GetFileValues
+        Only reads the schema, so it can run on another thread once the model is finished
+        """
+        schema = self.schema
+        for row, value in enumerate(fileValues):
+            yield loader.PropertyRecord(schema.names[row], schema.datatypes[row], value, schema.GetDescription(row), row, schema.constraints.get(row))
+
+    def ReloadValues(self, fileValues):
+        """
+        Take in values that changed in the source file since it was loaded, keeping any unsaved edit over the file's value
+        Args:
+            fileValues: dict of row -> the row's new value in the file
+        Returns:
+            (list) of the edited rows whose file value changed as well, in row order
+        """
+        conflicts = []
+        for row, fileValue in sorted(fileValues.items()):
+            if row not in self.savedValues:
+                self.values[row] = fileValue
+                self.decoded.pop(row, None)
+                self.validity.Update(row, fileValue, self.schema.datatypes[row], self.schema.constraints.get(row))
+            elif fileValue == self.values[row]:
+                # the file caught up with the edit
+                del self.savedValues[row]
+            else:
+                self.savedValues[row] = fileValue
+                conflicts.append(row)
+        return conflicts
+
+    def SetState(self, state):
+        """
+        Fill an empty model from GetState, revalidating the values against the current validators
+        Raises ValueError, KeyError or TypeError if the state is inconsistent, leaving the model empty
+        """
+        schema = TemplateSchema.FromState(state)
+        values = list(state["values"])
+        if len(values) != len(schema):
+            raise ValueError("columns have different lengths")
+        schema = ShareSchema(schema)
+
+        self.schema = schema
+        self.validity.ValidateRows(0, values, schema.datatypes, schema.constraints)
+        # as in AppendRecords, the value column is set last since its length is the number of rows that are ready
+        self.values = values
+
+    def LoadFromCache(self, modelCache, fileKey):
+        """
+        Fill an empty model from the cache, if it holds an entry for the file's current contents
+        Returns:
+            (bool) if the model was loaded, otherwise the file has to be parsed
+        """
+        state = modelCache.Load(fileKey)
+        if state is None:
+            return False
+        try:
+            self.SetState(state)
+        except (ValueError, KeyError, TypeError) as stateError:
+            logging.warning(f"Discarding inconsistent cache entry for {fileKey.path}: {stateError!r}")
+            modelCache.Remove(fileKey.path)
+            return False
+        return True
+
+    def GetRecord(self, row):
+        """
+        Returns:
+            (PropertyRecord) for the row, holding its current (possibly edited) value
+        """
+        schema = self.schema
+        return loader.PropertyRecord(schema.names[row], schema.datatypes[row], self.values[row], schema.GetDescription(row), row, schema.constraints.get(row))
+
+    def GetDescription(self, row):
+        return self.schema.GetDescription(row)
+
+    def IterRecords(self):
+        """
+        Yields:
+            (PropertyRecord) for each row in order, holding its current (possibly edited) value, without copying the columns
+        """
+        for row in range(len(self)):
+            yield self.GetRecord(row)
+
+    def GetDecoded(self, row):
+        """
+        Decode the row's value once, and reuse it until the value changes
+        Returns:
+            the typed value (see validation.Decode), or None if the value is empty or invalid
+        """
+        try:
+            return self.decoded[row]
+        except KeyError:
+            pass
+        value = self.values[row]
+        decoded = None
+        if value and self.validity.IsValid(row):
+            try:
+                decoded = validation.Decode(value, self.datatypes[row])
+            except ValueError:
+                pass
+        self.decoded[row] = decoded
+        return decoded
+
+    def PeekDecoded(self, row):
+        """
+        Returns:
+            the row's decoded value if it is already cached (see GetDecoded), otherwise None; never decodes,
+            so streaming every row (as export does) does not fill the cache
+        """
+        return self.decoded.get(row)
+
+    def IsComplete(self, row):
+        """
+        Returns:
+            (bool) if the row has both the Name and DataType that are required to edit it
+        """
+        return bool(self.names[row] and self.datatypes[row])
+
+    def SetValue(self, row, value, result=None):
+        """
+        Store an edited value, updating the validity cache, edited rows and decoded form for just that row
+        The value is decoded once, both to check its constraints and for GetDecoded
+        Args:
+            result: (bool, str, decoded) of validation.ValidateDecoded for the value, if it is already known, so it is
+                not validated again
+        Returns:
+            (bool, str) is the new value valid, and the error message if not
+        """
+        savedValue = self.savedValues.get(row, self.values[row])
+        if value == savedValue:
+            self.savedValues.pop(row, None)
+        else:
+            self.savedValues[row] = savedValue
+        self.values[row] = value
+        if result is None:
+            result = validation.ValidateDecoded(value, self.datatypes[row], self.constraints.get(row))
+        isValid, errorMessage, decoded = result
+        if decoded is None:
+            self.decoded.pop(row, None)
+        else:
+            self.decoded[row] = decoded
+        return self.validity.Set(row, isValid, errorMessage)
+
+    def GetProperty(self, name):
+        """
+        Returns:
+            (PropertyRecord) for the property with the given name, holding its current (possibly edited) value, or None
+        """
+        row = self.propertyIndex.FindRow(name)
+        if row is None:
+            return None
+        return self.GetRecord(row)
+
+    def SetPropertyValue(self, name, value):
+        """
+        Set the value of the property with the given name, exactly as if it had been edited in the grid
+        Raises KeyError if there is no such property
+        Returns:
+            (bool, str) is the new value valid, and the error message if not
+        """
+        row = self.propertyIndex.FindRow(name)
+        if row is None:
+            raise KeyError(name)
+        return self.SetValue(row, value)
+
+    def IsDirty(self):
+        return bool(self.savedValues)
+
+    def GetEdits(self):
+        """
+        Returns:
+            (dict) of property position -> value, for every edited row
+        """
+        return {row: self.values[row] for row in self.savedValues}
+
+    def Save(self, destPath=None):
+        """
+        Write the edited values to destPath (the source file by default), patching only the edited properties
+        Raises the errors of writer.SaveValues
+        """
+        destPath = destPath or self.sourcePath
+        writer.SaveValues(self.sourcePath, destPath, self.GetEdits())
+        self.savedValues.clear()
+        self.sourcePath = destPath
+
+
+def LoadModel(filePath, modelCache=None):
+    """
+    Load a whole config file into a model, headless
+    With a ModelCache, an unchanged file is loaded from the cache without parsing, and a parsed file is added to it
+    Raises ET.ParseError or OSError if the file cannot be read
+    """
+    configModel = ConfigModel(filePath)
+    if not modelCache:
+        for records in loader.IterPropertyBatches(filePath):
+            configModel.AppendRecords(records)
+        configModel.Finish()
+        return configModel
+
+    fileKey = cache.StatFileKey(filePath)
+    if configModel.LoadFromCache(modelCache, fileKey):
+        return configModel
+    with open(filePath, "rb") as xmlFile:
+        reader = cache.HashingReader(xmlFile)
+        for records in loader.IterPropertyBatches(reader):
+            configModel.AppendRecords(records)
+        fileKey = reader.FileKey(fileKey)
+    configModel.Finish()
+    modelCache.Store(fileKey, configModel.GetState(), len(configModel))
+    return configModel
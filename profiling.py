@@ -0,0 +1,152 @@
+"""
+Lightweight timing instrumentation, exported as a Chrome trace (chrome://tracing, or https://ui.perfetto.dev)
+Instrumentation is disabled unless Enable() is called (see the --profile flag); while disabled Trace() returns a shared
+do-nothing context manager and Count() returns immediately, so instrumented code pays next to nothing
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+enabled = False
+# completed trace events, in Chrome trace format
+events = []
+# counter name -> total
+counters = {}
+startTime = time.perf_counter()
+
+
+def Enable():
+    """Start recording spans and counters"""
+    global enabled, startTime
+    enabled = True
+    startTime = time.perf_counter()
+    events.clear()
+    counters.clear()
+
+
+def Timestamp():
+    """
+    Returns:
+        (float) microseconds since Enable(), the time unit of Chrome traces
+    """
+    return (time.perf_counter() - startTime) * 1e6
+
+
+class Span:
+    """Context manager that records one complete ("X") trace event covering the with block"""
+
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = Timestamp()
+        return self
+
+    def __exit__(self, *exception):
+        events.append({
+            "name": self.name,
+            "ph": "X",
+            "ts": self.start,
+            "dur": Timestamp() - self.start,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": self.args,
+        })
+        return False
+
+
+class NullSpan:
+    """Shared stand in for Span while instrumentation is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+def Trace(name, **args):
+    """
+    Time a block of code:
+        with profiling.Trace("parse", path=filePath):
+    """
+    if not enabled:
+        return NULL_SPAN
+    return Span(name, args)
+
+
+def TraceIterator(name, iterable):
+    """
+    Time each step of an iterable separately, such as each batch pulled from a streaming parser
+    Returns the iterable unchanged while instrumentation is disabled
+    """
+    if not enabled:
+        return iterable
+    return TracedIterator(name, iterable)
+
+
+def TracedIterator(name, iterable):
+    iterator = iter(iterable)
+    while True:
+        with Trace(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def Instant(name, **args):
+    """Record a single point in time, such as a dialog returning"""
+    if not enabled:
+        return
+    events.append({"name": name, "ph": "i", "s": "t", "ts": Timestamp(), "pid": os.getpid(), "tid": threading.get_ident(), "args": args})
+
+
+def Count(name, amount=1):
+    """Add to a named counter, such as widgets created or events handled"""
+    if not enabled:
+        return
+    counters[name] = counters.get(name, 0) + amount
+
+
+def Summary():
+    """
+    Returns:
+        (dict) span name -> (number of spans, total seconds)
+    """
+    summary = {}
+    for event in events:
+        if event["ph"] != "X":
+            continue
+        count, total = summary.get(event["name"], (0, 0.0))
+        summary[event["name"]] = (count + 1, total + event["dur"] / 1e6)
+    return summary
+
+
+def WriteTrace(filePath):
+    """Write the recorded spans and final counter values as a Chrome trace JSON file"""
+    counterEvents = [
+        {"name": name, "ph": "C", "ts": Timestamp(), "pid": os.getpid(), "args": {"value": value}}
+        for name, value in sorted(counters.items())
+    ]
+    with open(filePath, "w") as traceFile:
+        json.dump({"traceEvents": events + counterEvents, "displayTimeUnit": "ms", "otherData": {"counters": counters}}, traceFile)
+
+    for name, (count, total) in sorted(Summary().items(), key=lambda item: -item[1][1]):
+        logging.info(f"{name}: {count} spans, {total:.3f} s")
+    for name, value in sorted(counters.items()):
+        logging.info(f"{name}: {value}")
+    logging.info(f"Wrote trace to {filePath}")
@@ -0,0 +1,210 @@
+"""
+Regression tests for the byte range save path (writer.PatchValues), checked against the ElementTree rewrite
+(writer.RewriteValues) it replaced: both must produce the same document, and the patch must leave every byte
+outside the edited values as it was
+
+    python -m pytest -q tests
+"""
+
+import io
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import loader
+import writer
+
+CONFIG = """<?xml version="1.0" encoding="{encoding}"?>
+<!-- kept as is: comments, blank lines and 'quotes' -->
+<Template>
+\t<Properties>
+\t\t<Property>
+\t\t\t<Name>Lane-Count</Name>
+\t\t\t<DataType>Integer</DataType>
+\t\t\t<Value>4</Value>
+\t\t\t<Description>Number of data lanes</Description>
+\t\t</Property>
+\t\t<Property>
+\t\t\t<Name>Self-Closing</Name>
+\t\t\t<DataType>Integer</DataType>
+\t\t\t<Value />
+\t\t\t<Description>Empty value written as a self-closing tag</Description>
+\t\t</Property>
+\t\t<Property>
+\t\t\t<Name>Missing</Name>
+\t\t\t<DataType>Integer</DataType>
+\t\t\t<Description>No value element at all</Description>
+\t\t</Property>
+\t\t<Property>
+\t\t\t<Name>Attributes</Name>
+\t\t\t<DataType>Package</DataType>
+\t\t\t<Value unit="ns" note='a "quoted" &gt; sign'>1, 2</Value>
+\t\t\t<Description>Value with attributes</Description>
+\t\t</Property>
+\t\t<Property>
+\t\t\t<Name>Entities</Name>
+\t\t\t<DataType>String</DataType>
+\t\t\t<Value>a &amp; b &lt;c&gt; café</Value>
+\t\t\t<Description>Escaped and non ASCII text</Description>
+\t\t</Property>
+\t</Properties>
+</Template>
+"""
+
+EDITS = {
+    0: "0x8",
+    1: "12",
+    2: "7",
+    3: "3, 4",
+    4: "x < y & \"z\" éè",
+}
+
+
+def WriteConfig(directory, encoding="utf-8", name="config.xml"):
+    filePath = os.path.join(directory, name)
+    with open(filePath, "wb") as xmlFile:
+        xmlFile.write(CONFIG.format(encoding=encoding).encode(encoding, "xmlcharrefreplace"))
+    return filePath
+
+
+def ReadValues(filePath):
+    return [record.value for record in loader.IterProperties(filePath)]
+
+
+def Canonical(data):
+    """The document with formatting differences (declaration, quoting, empty tags) removed"""
+    return ET.canonicalize(data.decode("utf-8") if isinstance(data, bytes) else data, strip_text=True)
+
+
+def Patch(filePath, edits):
+    patched = io.BytesIO()
+    writer.PatchValues(filePath, patched, edits, writer.DeclaredEncoding(filePath))
+    return patched.getvalue()
+
+
+def Rewrite(filePath, edits):
+    rewritten = io.BytesIO()
+    writer.RewriteValues(filePath, rewritten, edits)
+    return rewritten.getvalue()
+
+
+def testFindValueRanges(tmp_path):
+    filePath = WriteConfig(tmp_path)
+    with open(filePath, "rb") as xmlFile:
+        data = xmlFile.read()
+    ranges = writer.FindValueRanges(filePath, range(5))
+
+    kind, tagStart, contentEnd = ranges[0]
+    assert kind == "value" and data[tagStart:contentEnd] == b"<Value>4"
+    kind, tagStart, _ = ranges[1]
+    assert kind == "value" and data[tagStart:].startswith(b"<Value />")
+    kind, propertyEnd, _ = ranges[2]
+    assert kind == "missing" and data[propertyEnd:].startswith(b"</Property>")
+    kind, tagStart, contentEnd = ranges[3]
+    assert kind == "value" and data[tagStart:contentEnd].endswith(b"'a \"quoted\" &gt; sign'>1, 2")
+    kind, tagStart, contentEnd = ranges[4]
+    assert data[tagStart:contentEnd] == "<Value>a &amp; b &lt;c&gt; café".encode("utf-8")
+
+
+def testFindValueRangesOfMissingProperty(tmp_path):
+    filePath = WriteConfig(tmp_path)
+    with pytest.raises(ValueError):
+        writer.FindValueRanges(filePath, [5])
+
+
+@pytest.mark.parametrize("position", sorted(EDITS))
+def testPatchMatchesRewrite(tmp_path, position):
+    filePath = WriteConfig(tmp_path)
+    edits = {position: EDITS[position]}
+    assert Canonical(Patch(filePath, edits)) == Canonical(Rewrite(filePath, edits))
+
+
+def testPatchAllMatchesRewrite(tmp_path):
+    filePath = WriteConfig(tmp_path)
+    assert Canonical(Patch(filePath, EDITS)) == Canonical(Rewrite(filePath, EDITS))
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "iso-8859-1"])
+def testPatchOnlyChangesValues(tmp_path, encoding):
+    """Patching values back to what they were gives the original bytes, so nothing else in the file was touched"""
+    filePath = WriteConfig(tmp_path, encoding)
+    with open(filePath, "rb") as xmlFile:
+        original = xmlFile.read()
+    originalValues = ReadValues(filePath)
+    # the self-closing and missing <Value> are expanded by any edit, so only the others can round trip exactly
+    positions = (0, 3, 4)
+
+    editedPath = os.path.join(tmp_path, "edited.xml")
+    writer.SaveValues(filePath, editedPath, {position: EDITS[position] for position in positions})
+    edited = ReadValues(editedPath)
+    assert [edited[position] for position in positions] == [EDITS[position] for position in positions]
+
+    restoredPath = os.path.join(tmp_path, "restored.xml")
+    writer.SaveValues(editedPath, restoredPath, {position: originalValues[position] for position in positions})
+    with open(restoredPath, "rb") as xmlFile:
+        assert xmlFile.read() == original
+
+
+def testUnchangedValuesKeepBytes(tmp_path):
+    filePath = WriteConfig(tmp_path)
+    with open(filePath, "rb") as xmlFile:
+        original = xmlFile.read()
+    values = ReadValues(filePath)
+    assert Patch(filePath, {0: values[0], 3: values[3], 4: values[4]}) == original
+
+
+def testSelfClosingAndMissingValues(tmp_path):
+    filePath = WriteConfig(tmp_path)
+    patched = Patch(filePath, {1: "12", 2: "7"})
+    assert b"<Value>12</Value>" in patched
+    assert b"<Value>7</Value></Property>" in patched
+    assert b"<Value />" not in patched
+    savedPath = os.path.join(tmp_path, "saved.xml")
+    writer.SaveValues(filePath, savedPath, {1: "12", 2: "7"})
+    assert ReadValues(savedPath) == ["4", "12", "7", "1, 2", "a & b <c> café"]
+
+
+def testAttributesKept(tmp_path):
+    filePath = WriteConfig(tmp_path)
+    patched = Patch(filePath, {3: "3, 4"})
+    assert "<Value unit=\"ns\" note='a \"quoted\" &gt; sign'>3, 4</Value>".encode("utf-8") in patched
+
+
+def testEntitiesEscaped(tmp_path):
+    filePath = WriteConfig(tmp_path)
+    savedPath = os.path.join(tmp_path, "saved.xml")
+    writer.SaveValues(filePath, savedPath, {4: EDITS[4]})
+    assert ReadValues(savedPath)[4] == EDITS[4]
+
+
+def testCharactersOutsideEncoding(tmp_path):
+    filePath = WriteConfig(tmp_path, "ascii")
+    savedPath = os.path.join(tmp_path, "saved.xml")
+    writer.SaveValues(filePath, savedPath, {4: "é✓"})
+    with open(savedPath, "rb") as xmlFile:
+        assert b"&#233;&#10003;" in xmlFile.read()
+    assert ReadValues(savedPath)[4] == "é✓"
+
+
+def testUTF16(tmp_path):
+    filePath = WriteConfig(tmp_path, "utf-16")
+    assert writer.DeclaredEncoding(filePath) == "utf-16"
+    savedPath = os.path.join(tmp_path, "saved.xml")
+    writer.SaveValues(filePath, savedPath, EDITS)
+    with open(savedPath, "rb") as xmlFile:
+        saved = xmlFile.read()
+    assert saved == Rewrite(filePath, EDITS)
+    assert ReadValues(savedPath) == [EDITS[position] for position in sorted(EDITS)]
+
+
+def testSaveInPlace(tmp_path):
+    filePath = WriteConfig(tmp_path)
+    os.chmod(filePath, 0o640)
+    writer.SaveValues(filePath, filePath, {0: "5"})
+    assert ReadValues(filePath)[0] == "5"
+    assert os.stat(filePath).st_mode & 0o777 == 0o640
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
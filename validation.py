@@ -0,0 +1,737 @@
+"""
+Validation engine for MIPI configuration values
+Kept free of any wx imports so it can be run headless (CI, batch validation of config repositories)
+"""
+
+import json
+import logging
+import re
+import sys
+import xml.etree.ElementTree as ET
+from abc import ABC, abstractmethod
+from array import array
+from collections import namedtuple
+
+import loader
+
+MISSING_NAME_OR_DATATYPE = "Name and DataType are required, and should be added to the template before loading"
+
+
+DEC_OR_HEX_PATTERN = r"(?:\d+|0[xX][0-9a-fA-F]+)"
+# a decimal or hexidecimal number short enough to always fit in 64 bits: up to 19 decimal digits, or 16 significant
+# hexidecimal digits (20 digit decimals may or may not fit, so they are decoded to check)
+DEC_OR_HEX_64_PATTERN = r"(?:0[xX]0*[0-9a-fA-F]{1,16}|\d{1,19})"
+
+# parsed <Min>, <Max>, <BitWidth> and <Count> of a property, each None if not given
+Constraints = namedtuple("Constraints", ("minimum", "maximum", "bitWidth", "count"))
+
+
+class DatatypeValidator(ABC):
+    """
+    Base class for the validator of a single datatype
+    Subclasses do any expensive setup (compiling rules) once in __init__, so validating a value only pays for the match
+    """
+
+    def __init__(self, datatype, errorMessage):
+        self.datatype = datatype
+        self.errorMessage = errorMessage
+
+    @abstractmethod
+    def IsValid(self, text):
+        """
+        Returns:
+            (bool) if the given non-empty string value is valid for this datatype
+        """
+
+    def Validate(self, text):
+        """
+        Returns:
+            (bool, str) is the input valid for this datatype, and the error message if not
+        """
+        if not text or self.IsValid(text):
+            # empty textbox is always fine
+            return True, ""
+        return False, self.errorMessage
+
+    def ValidateMany(self, values):
+        """
+        Validate a whole column of values in one call
+        Returns:
+            (list) of (index, errorMessage) for each invalid value
+        """
+        isValid = self.IsValid
+        errorMessage = self.errorMessage
+        return [(index, errorMessage) for index, text in enumerate(values) if text and not isValid(text)]
+
+    def Decode(self, text):
+        """
+        Returns:
+            the typed form of a valid, non-empty value; the text itself unless the datatype is numeric
+        Raises ValueError if the value cannot be represented
+        """
+        return text
+
+    def CheckConstraints(self, text, constraints):
+        """
+        Args:
+            text: a valid, non-empty value
+            constraints: (Constraints) of its property
+        Returns:
+            (str) the error message for the first constraint the value breaks, or an empty string
+        """
+        try:
+            decoded = self.Decode(text)
+        except ValueError as decodeError:
+            return f"{self.datatype} {decodeError}"
+        errorMessage = CheckDecodedConstraints(decoded, constraints)
+        return f"{self.datatype} {errorMessage}" if errorMessage else ""
+
+
+class RegexValidator(DatatypeValidator):
+    """Validator for datatypes whose values must fully match a regular expression"""
+
+    def __init__(self, datatype, pattern, errorMessage, strip=False, decoder=None):
+        super().__init__(datatype, errorMessage)
+        self.rule = re.compile(pattern)
+        self.strip = strip
+        # function from a matching value to its typed form, see Decode
+        self.decoder = decoder
+
+    def IsValid(self, text):
+        if self.strip:
+            text = text.strip()
+        return self.rule.fullmatch(text) is not None
+
+    def ValidateMany(self, values):
+        # bind the compiled matcher once, rather than per value
+        match = self.rule.fullmatch
+        errorMessage = self.errorMessage
+        if self.strip:
+            return [(index, errorMessage) for index, text in enumerate(values) if text and match(text.strip()) is None]
+        return [(index, errorMessage) for index, text in enumerate(values) if text and match(text) is None]
+
+    def Decode(self, text):
+        if self.decoder is None:
+            return text
+        return self.decoder(text)
+
+
+class IntegerRangeValidator(RegexValidator):
+    """Validator for (optionally signed) decimal or hexidecimal integers within an inclusive range"""
+
+    def __init__(self, datatype, minimum=None, maximum=None, signed=False):
+        sign = r"[-+]?" if signed else ""
+        errorMessage = f"{datatype} should be entered in decimal (12) or hexidecimal (0xF)"
+        if minimum is not None or maximum is not None:
+            errorMessage += f" between {'-' if minimum is None else minimum} and {'-' if maximum is None else maximum}"
+        super().__init__(datatype, sign + DEC_OR_HEX_PATTERN, errorMessage, decoder=ParseDecOrHex)
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def IsValid(self, text):
+        if self.rule.fullmatch(text) is None:
+            return False
+        number = ParseDecOrHex(text)
+        if self.minimum is not None and number < self.minimum:
+            return False
+        if self.maximum is not None and number > self.maximum:
+            return False
+        return True
+
+    def ValidateMany(self, values):
+        return DatatypeValidator.ValidateMany(self, values)
+
+
+class PackageValidator(RegexValidator):
+    """
+    Validator for comma separated lists of decimal or hexidecimal elements
+    Elements are decoded as unsigned 64 bit integers (see DecodePackage). The compiled rule only accepts elements
+    short enough to always fit, so only a value with a 20 digit (or longer) element is decoded to check it
+    """
+
+    LONG_ELEMENT_LENGTH = 19
+
+    def __init__(self, datatype, pattern, wellFormedPattern, errorMessage):
+        """
+        Args:
+            pattern: matches the values whose elements all fit in 64 bits, without decoding them
+            wellFormedPattern: matches any comma separated list of elements, however long
+        """
+        super().__init__(datatype, pattern, errorMessage, strip=True, decoder=DecodePackage)
+        self.wellFormedRule = re.compile(wellFormedPattern)
+        self.overflowMessage = f"{datatype} elements should fit in 64 bits"
+
+    def FindError(self, text):
+        """
+        Args:
+            text: a stripped value that does not match the compiled rule
+        Returns:
+            (str) why the value is invalid, or None if it is valid after all
+        """
+        # rare: a malformed value, or one with an element too long for the rule to know if it fits, which takes at
+        # least 19 characters (20 decimal digits, or 0x and 17 hexidecimal digits)
+        if len(text) < self.LONG_ELEMENT_LENGTH or self.wellFormedRule.fullmatch(text) is None:
+            return self.errorMessage
+        try:
+            DecodePackage(text)
+        except ValueError:
+            return self.overflowMessage
+        return None
+
+    def IsValid(self, text):
+        text = text.strip()
+        return self.rule.fullmatch(text) is not None or self.FindError(text) is None
+
+    def Validate(self, text):
+        if not text:
+            return True, ""
+        text = text.strip()
+        errorMessage = None if self.rule.fullmatch(text) is not None else self.FindError(text)
+        if errorMessage is None:
+            return True, ""
+        return False, errorMessage
+
+    def ValidateMany(self, values):
+        # nearly every value matches the compiled rule, so only the rest pay for FindError
+        match = self.rule.fullmatch
+        findError = self.FindError
+        invalid = []
+        for index, text in enumerate(values):
+            if text:
+                text = text.strip()
+                if match(text) is None:
+                    errorMessage = findError(text)
+                    if errorMessage is not None:
+                        invalid.append((index, errorMessage))
+        return invalid
+
+
+class EnumValidator(DatatypeValidator):
+    """Validator for datatypes that only accept one of a fixed set of values"""
+
+    def __init__(self, datatype, choices, caseSensitive=True):
+        self.caseSensitive = caseSensitive
+        self.choices = frozenset(choices if caseSensitive else (choice.lower() for choice in choices))
+        super().__init__(datatype, f"{datatype} should be one of: {', '.join(choices)}")
+
+    def IsValid(self, text):
+        return (text if self.caseSensitive else text.lower()) in self.choices
+
+
+def ParseDecOrHex(text):
+    """
+    Returns:
+        (int) the value of a decimal or 0x prefixed hexidecimal string, with an optional sign
+    Decimals are always base 10, so leading zeros (012) are allowed
+    """
+    body = text.lstrip("+-")
+    number = int(body, 16) if body[:2] in ("0x", "0X") else int(body, 10)
+    return -number if text.startswith("-") else number
+
+
+def DecodeBitMap(text):
+    """
+    Returns:
+        (int) the bits of a 0b prefixed BitMap
+    """
+    return int(text[2:], 2)
+
+
+def DecodePackage(text):
+    """
+    Decode a valid Package into a compact array, converting every element in one pass
+    Returns:
+        (array) of unsigned 64 bit elements
+    Raises ValueError if an element does not fit in 64 bits
+    """
+    parts = text.split(",")
+    # int() ignores the whitespace around each element, and base 16 accepts the 0x prefix
+    if "x" in text or "X" in text:
+        numbers = [int(part, 16) if "x" in part or "X" in part else int(part) for part in parts]
+    else:
+        numbers = map(int, parts)
+    try:
+        return array("Q", numbers)
+    except OverflowError:
+        raise ValueError("elements should fit in 64 bits") from None
+
+
+def CheckDecodedConstraints(decoded, constraints):
+    """
+    Check a decoded value against its property's constraints
+    The bounds of a Package are found with single passes of min() and max() over its array, rather than per element
+    Returns:
+        (str) a description of the first constraint broken (without the datatype), or an empty string
+    """
+    if isinstance(decoded, array):
+        if constraints.count is not None and len(decoded) != constraints.count:
+            return f"should have {constraints.count} elements, found {len(decoded)}"
+        if not decoded:
+            return ""
+        lowest, highest = min(decoded), max(decoded)
+    elif isinstance(decoded, int):
+        lowest = highest = decoded
+    else:
+        return ""
+
+    if constraints.minimum is not None and lowest < constraints.minimum:
+        return f"should be at least {constraints.minimum}, found {lowest}"
+    if constraints.maximum is not None and highest > constraints.maximum:
+        return f"should be at most {constraints.maximum}, found {highest}"
+    if constraints.bitWidth is not None:
+        if lowest < 0:
+            # signed values are checked as two's complement
+            limit = 1 << (constraints.bitWidth - 1)
+            fits = -limit <= lowest and highest < limit
+        else:
+            fits = highest.bit_length() <= constraints.bitWidth
+        if not fits:
+            return f"should fit in {constraints.bitWidth} bits, found {highest if highest.bit_length() > constraints.bitWidth else lowest}"
+    return ""
+
+
+# constraint texts -> Constraints or the error message for texts that cannot be parsed,
+# since properties of the same kind usually share constraints
+_parsedConstraints = {}
+
+
+def ParseConstraints(texts):
+    """
+    Args:
+        texts: the Min, Max, BitWidth and Count texts of a property (see loader.CONSTRAINT_TAGS)
+    Returns:
+        (Constraints) parsed as decimal or hexidecimal integers
+    Raises ValueError naming the constraint that is not an integer, or not a positive width or count
+    """
+    try:
+        parsed = _parsedConstraints[texts]
+    except KeyError:
+        try:
+            parsed = _ParseConstraintTexts(texts)
+        except ValueError as constraintError:
+            parsed = str(constraintError)
+        _parsedConstraints[texts] = parsed
+    if isinstance(parsed, str):
+        raise ValueError(parsed)
+    return parsed
+
+
+def _ParseConstraintTexts(texts):
+    """
+    Returns:
+        (Constraints) parsed from the texts, uncached (see ParseConstraints)
+    Raises ValueError naming the constraint that is not an integer, or not a positive width or count
+    """
+    parsed = []
+    for tag, text in zip(loader.CONSTRAINT_TAGS, texts):
+        text = text.strip()
+        if not text:
+            parsed.append(None)
+            continue
+        if re.fullmatch(r"[-+]?" + DEC_OR_HEX_PATTERN, text) is None:
+            raise ValueError(f"Invalid {tag} constraint '{text}', it should be a decimal (12) or hexidecimal (0xF) integer")
+        parsed.append(ParseDecOrHex(text))
+    constraints = Constraints(*parsed)
+    for tag, number in (("BitWidth", constraints.bitWidth), ("Count", constraints.count)):
+        if number is not None and number < 1:
+            raise ValueError(f"Invalid {tag} constraint '{number}', it should be at least 1")
+    return constraints
+
+
+def DescribeConstraints(texts):
+    """
+    Returns:
+        (str) the constraints of a property for display, such as "0 to 255, 8 bits", or an empty string
+    """
+    try:
+        constraints = ParseConstraints(texts)
+    except ValueError as constraintError:
+        return str(constraintError)
+    parts = []
+    if constraints.minimum is not None or constraints.maximum is not None:
+        parts.append(f"{'-' if constraints.minimum is None else constraints.minimum} to {'-' if constraints.maximum is None else constraints.maximum}")
+    if constraints.bitWidth is not None:
+        parts.append(f"{constraints.bitWidth} bits")
+    if constraints.count is not None:
+        parts.append(f"{constraints.count} elements")
+    return ", ".join(parts)
+
+
+# datatype validators, keyed by lower case datatype name
+validators = {}
+# exact datatype spelling -> validator, so repeated lookups skip normalization
+_resolvedValidators = {}
+
+
+def RegisterDatatype(validator, *aliases):
+    """
+    Register a validator for its datatype name (and any aliases), replacing any existing validator for those names
+    Lookups are case insensitive
+    """
+    for datatype in (validator.datatype, *aliases):
+        validators[datatype.lower()] = validator
+    _resolvedValidators.clear()
+
+
+def GetValidator(datatype):
+    """
+    Returns:
+        (DatatypeValidator) registered for the given datatype, or None if it is unknown
+    """
+    try:
+        return _resolvedValidators[datatype]
+    except KeyError:
+        validator = validators.get(datatype.strip().lower())
+        _resolvedValidators[datatype] = validator
+        return validator
+
+
+RegisterDatatype(RegexValidator(
+    "Integer",
+    DEC_OR_HEX_PATTERN,
+    "Integer should be entered in decimal (12) or hexidecimal (0xF)",
+    decoder=ParseDecOrHex,
+))
+RegisterDatatype(RegexValidator(
+    "BitMap",
+    r"0b[01]+",
+    "BitMap should be entered in the format (0b1010101)",
+    decoder=DecodeBitMap,
+))
+# regex breakdown:
+#   match 1 dec or hex value
+#   (?:,\s + decOrHex + )* match 0 or more comma-whitespace-decOrHex
+RegisterDatatype(PackageValidator(
+    "Package",
+    DEC_OR_HEX_64_PATTERN + r"(?:,\s" + DEC_OR_HEX_64_PATTERN + r")*",
+    DEC_OR_HEX_PATTERN + r"(?:,\s" + DEC_OR_HEX_PATTERN + r")*",
+    "Package should be enetered as a combination of decimals or hexidecimals in a comma separated list (0xA, 3, 0x4)",
+))
+
+
+def Validate(text, datatype, constraints=None):
+    """
+    Main entrypoint for validating input
+    Args:
+        constraints: the property's constraint texts (see PropertyRecord), or None
+    Returns:
+        (bool, str) is the input valid for the given datatype and constraints, and the error message if not
+    """
+    if not text:
+        # empty textbox is always fine
+        return True, ""
+    validator = GetValidator(datatype)
+    if validator is None:
+        return False, f"Unknown datatype {datatype}"
+    isValid, errorMessage = validator.Validate(text)
+    if isValid and constraints is not None:
+        errorMessage = CheckConstraints(text, datatype, constraints)
+        isValid = not errorMessage
+    return isValid, errorMessage
+
+
+def ValidateDecoded(text, datatype, constraints=None):
+    """
+    Validate a value and decode it in the same pass, decoding only once even when there are constraints to check
+    Returns:
+        (bool, str, decoded) is the input valid, the error message if not, and its typed form (see Decode),
+            which is None if the value is empty or invalid
+    """
+    if not text:
+        return True, "", None
+    validator = GetValidator(datatype)
+    if validator is None:
+        return False, f"Unknown datatype {datatype}", None
+    isValid, errorMessage = validator.Validate(text)
+    if not isValid:
+        return False, errorMessage, None
+    try:
+        decoded = validator.Decode(text)
+    except ValueError as decodeError:
+        return False, f"{validator.datatype} {decodeError}", None
+    if constraints is not None:
+        try:
+            parsedConstraints = ParseConstraints(constraints)
+        except ValueError as constraintError:
+            return False, str(constraintError), None
+        errorMessage = CheckDecodedConstraints(decoded, parsedConstraints)
+        if errorMessage:
+            return False, f"{validator.datatype} {errorMessage}", None
+    return True, "", decoded
+
+
+def CheckConstraints(text, datatype, constraints):
+    """
+    Args:
+        text: a non-empty value that is valid for the datatype
+        constraints: the property's constraint texts (see PropertyRecord)
+    Returns:
+        (str) the error message for the first constraint the value breaks, or an empty string
+    """
+    try:
+        parsedConstraints = ParseConstraints(constraints)
+    except ValueError as constraintError:
+        return str(constraintError)
+    return GetValidator(datatype).CheckConstraints(text, parsedConstraints)
+
+
+def Decode(text, datatype):
+    """
+    Returns:
+        the typed form of a valid, non-empty value: (int) for Integer and BitMap, (array) of unsigned 64 bit
+            elements for Package, and the text itself for other datatypes
+    Raises ValueError if the value cannot be represented
+    """
+    validator = GetValidator(datatype)
+    if validator is None:
+        return text
+    return validator.Decode(text)
+
+
+def ValidateMany(values, datatype):
+    """
+    Validate a column of values that share a datatype
+    Returns:
+        (list) of (index, errorMessage) for each invalid value
+    """
+    validator = GetValidator(datatype)
+    if validator is None:
+        errorMessage = f"Unknown datatype {datatype}"
+        return [(index, errorMessage) for index, text in enumerate(values) if text]
+    return validator.ValidateMany(values)
+
+
+def IsValidDecOrHex(value):
+    """
+    Returns:
+        (bool, str) if the given string value is valid as either a decimal or hexidecimal
+            and the relevant error message if not
+    """
+    return GetValidator("Integer").Validate(value)
+
+
+def IsValidBitMap(value):
+    """
+    Returns:
+        (bool, str) if the given string value is valid as a BitMap
+            and the relevant error message if not
+    """
+    return GetValidator("BitMap").Validate(value)
+
+
+def IsValidPackage(value):
+    """
+    Returns:
+        (bool, str) if the given string value contains a comma separated set of valid decimals or hexidecimals,
+            and the relevant error message if not
+    """
+    return GetValidator("Package").Validate(value)
+
+
+def ValidateAllInput(entries):
+    """
+    Runs validation against all given (text, datatype) pairs
+    Returns:
+        (bool, str) if all entries are valid, or the first error message if not
+    """
+    for text, datatype in entries:
+        isValid, errorMessage = Validate(text, datatype)
+        if not isValid:
+            return isValid, errorMessage
+    return True, ""
+
+
+class ValidityCache:
+    """
+    Remembers which rows of a loaded config are invalid, so the config never has to be revalidated as a whole
+    Rows are validated once when loaded, then one at a time as their values change
+    """
+
+    def __init__(self):
+        # row -> error message, for invalid rows only
+        self.errors = {}
+
+    def ValidateRows(self, startRow, values, datatypes, constraints=None):
+        """
+        Validate a batch of newly loaded rows, one column per datatype
+        Args:
+            startRow: the row of the first value
+            values, datatypes: parallel sequences for the rows that follow
+            constraints: dict of offset (from startRow) -> constraint texts, for the rows that have constraints
+        """
+        columns = {}
+        for offset, datatype in enumerate(datatypes):
+            columns.setdefault(datatype, []).append(offset)
+        for datatype, offsets in columns.items():
+            for index, errorMessage in ValidateMany([values[offset] for offset in offsets], datatype):
+                self.errors[startRow + offsets[index]] = errorMessage
+
+        # constraints are only checked for values that are already well formed
+        for offset, constraintTexts in (constraints or {}).items():
+            row = startRow + offset
+            if values[offset] and row not in self.errors:
+                errorMessage = CheckConstraints(values[offset], datatypes[offset], constraintTexts)
+                if errorMessage:
+                    self.errors[row] = errorMessage
+
+    def Update(self, row, text, datatype, constraints=None):
+        """
+        Revalidate a single row after its value changed
+        Returns:
+            (bool, str) is the new value valid, and the error message if not
+        """
+        return self.Set(row, *Validate(text, datatype, constraints))
+
+    def Set(self, row, isValid, errorMessage):
+        """
+        Record the result of validating a row's new value elsewhere, such as while it was being typed
+        Returns:
+            (bool, str) the given result
+        """
+        if isValid:
+            self.errors.pop(row, None)
+        else:
+            self.errors[row] = errorMessage
+        return isValid, errorMessage
+
+    def IsValid(self, row=None):
+        """
+        Returns:
+            (bool) if the given row is valid, or if every row is valid when no row is given
+        """
+        if row is None:
+            return not self.errors
+        return row not in self.errors
+
+    def GetError(self, row):
+        """
+        Returns:
+            (str) the row's error message, or None if it is valid
+        """
+        return self.errors.get(row)
+
+    def InvalidCount(self):
+        return len(self.errors)
+
+    def InvalidRows(self):
+        """
+        Returns:
+            (list) of (row, errorMessage) for every invalid row, in row order
+        """
+        return sorted(self.errors.items())
+
+    def FirstError(self):
+        """
+        Returns:
+            (bool, str) if all rows are valid, or the error message of the first invalid row if not
+        """
+        if not self.errors:
+            return True, ""
+        return False, self.errors[min(self.errors)]
+
+
+def ReadProperties(filePath):
+    """
+    Parse an XML config file into a list of (name, datatype, value, constraints) tuples, in document order
+    Raises ET.ParseError or OSError if the file cannot be read
+    """
+    return [(record.name, record.datatype, record.value, record.constraints) for record in loader.IterProperties(filePath)]
+
+
+def FindInvalidProperties(properties):
+    """
+    Validate every (name, datatype, value, constraints) property, rather than stopping at the first error
+    Returns:
+        (list) of (row, name, datatype, value, errorMessage) for each invalid property, rows starting at 1
+    """
+    invalid = []
+    invalidRows = set()
+    # group rows into a column of values per datatype, so each column is validated in a single batch call
+    columns = {}
+    for row, (name, datatype, value, _) in enumerate(properties, start=1):
+        if not name or not datatype:
+            invalid.append((row, name, datatype, value, MISSING_NAME_OR_DATATYPE))
+            invalidRows.add(row)
+            continue
+        rows, values = columns.setdefault(datatype, ([], []))
+        rows.append(row)
+        values.append(value)
+
+    for datatype, (rows, values) in columns.items():
+        for index, errorMessage in ValidateMany(values, datatype):
+            row = rows[index]
+            name, _, value, _ = properties[row - 1]
+            invalid.append((row, name, datatype, value, errorMessage))
+            invalidRows.add(row)
+
+    for row, (name, datatype, value, constraints) in enumerate(properties, start=1):
+        if constraints is not None and value and row not in invalidRows:
+            errorMessage = CheckConstraints(value, datatype, constraints)
+            if errorMessage:
+                invalid.append((row, name, datatype, value, errorMessage))
+    invalid.sort()
+    return invalid
+
+
+def ValidateFile(filePath):
+    """
+    Validate a single config file
+    Runs in a worker process when validating in batch, so only returns plain picklable data
+    Returns:
+        (dict) with the file path, whether it is valid, a file level error (if it could not be parsed),
+            the number of properties, and a list of per-property errors
+    """
+    result = {"path": filePath, "valid": True, "error": "", "properties": 0, "errors": []}
+    try:
+        properties = ReadProperties(filePath)
+    except ET.ParseError as parseError:
+        result["valid"] = False
+        result["error"] = f"ParseError occurred while reading XML file {filePath}: {parseError.msg}"
+        return result
+    except OSError as osError:
+        result["valid"] = False
+        result["error"] = f"Unable to read {filePath}: {osError.strerror}"
+        return result
+
+    result["properties"] = len(properties)
+    for row, name, datatype, value, errorMessage in FindInvalidProperties(properties):
+        result["errors"].append({"row": row, "name": name, "datatype": datatype, "value": value, "error": errorMessage})
+    result["valid"] = not result["errors"]
+    return result
+
+
+def ValidateFiles(filePaths, workers=None):
+    """
+    Validate many config files, fanning out across a process pool
+    Yields:
+        (dict) the ValidateFile result for each file, in the order given
+    """
+    return loader.RunPerFile(ValidateFile, filePaths, workers)
+
+
+def RunValidateCommand(paths, workers=None, output=None):
+    """
+    Validate the given files and directories, writing one JSON object per line:
+        a "property" record for each invalid property, followed by a "file" summary record for each file
+    Returns:
+        (int) process exit code, 0 if every file is valid and 1 otherwise
+    """
+    output = output or sys.stdout
+    filePaths = loader.FindConfigFiles(paths)
+    logging.info(f"Validating {len(filePaths)} file(s)")
+
+    allValid = True
+    for result in ValidateFiles(filePaths, workers=workers):
+        for error in result["errors"]:
+            output.write(json.dumps({"type": "property", "path": result["path"], **error}) + "\n")
+        output.write(json.dumps({
+            "type": "file",
+            "path": result["path"],
+            "valid": result["valid"],
+            "properties": result["properties"],
+            "errors": len(result["errors"]),
+            "error": result["error"],
+        }) + "\n")
+        allValid = allValid and result["valid"]
+    output.flush()
+    return 0 if allValid else 1
@@ -0,0 +1,210 @@
+"""
+Save path for MIPI configuration files
+Only the <Value> elements of edited properties are rewritten: their byte ranges are located with a streaming expat scan,
+and the rest of the file (formatting, comments, declaration) is copied through unchanged.
+Files are always written to a temporary file next to the target and renamed over it, so a crash never leaves a half-written file.
+"""
+
+import os
+import re
+import tempfile
+import xml.etree.ElementTree as ET
+import xml.parsers.expat
+from xml.sax.saxutils import escape
+
+COPY_CHUNK_SIZE = 1024 * 1024
+SCAN_CHUNK_SIZE = 64 * 1024
+
+
+class StopScan(Exception):
+    """Raised from the expat handlers once every edited property has been located"""
+
+
+def DeclaredEncoding(filePath):
+    """
+    Returns:
+        (str) the lower case encoding from the file's XML declaration, utf-8 if there is none,
+            or utf-16 if the file starts with a UTF-16 byte order mark
+    """
+    with open(filePath, "rb") as xmlFile:
+        head = xmlFile.read(256)
+    if head.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "utf-16"
+    match = re.match(rb"""^(?:\xef\xbb\xbf)?<\?xml[^>]*encoding=["']([A-Za-z0-9._-]+)["']""", head)
+    return match.group(1).decode("ascii").lower() if match else "utf-8"
+
+
+def FindValueRanges(filePath, positions):
+    """
+    Locate the <Value> elements of the properties at the given positions (document order of their closing tags, as in loader.IterProperties)
+    The scan stops as soon as the last requested position has been found
+    Returns:
+        (dict) position -> ("value", tagStart, contentEnd) for an existing <Value>, where contentEnd is meaningless
+            for <Value/> (see PatchValues), or ("missing", propertyEnd, None) with the offset of the </Property> tag
+            to insert a <Value> before
+    """
+    remaining = set(positions)
+    ranges = {}
+    if not remaining:
+        return ranges
+
+    parser = xml.parsers.expat.ParserCreate()
+    # one entry per open element: [tag, value tag start, value content end] (only used for <Property>)
+    openElements = []
+    position = 0
+
+    def StartElement(tag, attributes):
+        if tag == "Value" and openElements and openElements[-1][0] == "Property" and openElements[-1][1] is None:
+            openElements[-1][1] = parser.CurrentByteIndex
+            openElements.append(["Value", None, True])
+            return
+        openElements.append([tag, None, None])
+
+    def EndElement(tag):
+        nonlocal position
+        element = openElements.pop()
+        if element[0] == "Value" and element[2]:
+            # end of the first <Value> child of the enclosing <Property>
+            openElements[-1][2] = parser.CurrentByteIndex
+            return
+        if tag != "Property":
+            return
+        if position in remaining:
+            if element[1] is None:
+                ranges[position] = ("missing", parser.CurrentByteIndex, None)
+            else:
+                # for <Value/> expat reports the end at the same place it reports the start of the next token, so it is not used
+                ranges[position] = ("value", element[1], element[2])
+            remaining.discard(position)
+            if not remaining:
+                raise StopScan()
+        position += 1
+
+    parser.StartElementHandler = StartElement
+    parser.EndElementHandler = EndElement
+
+    with open(filePath, "rb") as xmlFile:
+        try:
+            while True:
+                chunk = xmlFile.read(SCAN_CHUNK_SIZE)
+                parser.Parse(chunk, not chunk)
+                if not chunk:
+                    break
+        except StopScan:
+            pass
+        except xml.parsers.expat.ExpatError as expatError:
+            raise ET.ParseError(xml.parsers.expat.ErrorString(expatError.code)) from expatError
+
+    if remaining:
+        raise ValueError(f"{filePath} has fewer properties than expected, it may have been modified since it was loaded")
+    return ranges
+
+
+def ReadStartTag(sourceFile):
+    """
+    Read a start tag from the current position of the file, respecting quoted attribute values
+    Returns:
+        (bytes) the full tag, from < to >
+    """
+    tag = bytearray()
+    quote = None
+    while True:
+        chunk = sourceFile.read(256)
+        if not chunk:
+            raise ValueError("Unexpected end of file inside a <Value> tag")
+        for index, byte in enumerate(chunk):
+            if quote:
+                if byte == quote:
+                    quote = None
+            elif byte in b"'\"":
+                quote = byte
+            elif byte == ord(">"):
+                tag += chunk[:index + 1]
+                sourceFile.seek(index + 1 - len(chunk), os.SEEK_CUR)
+                return bytes(tag)
+        tag += chunk
+
+
+def CopyBytes(sourceFile, destFile, count):
+    """Copy count bytes from the current position of sourceFile, or everything remaining if count is None"""
+    while count is None or count > 0:
+        chunk = sourceFile.read(COPY_CHUNK_SIZE if count is None else min(count, COPY_CHUNK_SIZE))
+        if not chunk:
+            return
+        destFile.write(chunk)
+        if count is not None:
+            count -= len(chunk)
+
+
+def PatchValues(sourcePath, destFile, edits, encoding):
+    """
+    Copy the source file to destFile, replacing the <Value> text of each edited property
+    Args:
+        edits: dict of property position -> new value text
+    """
+    ranges = FindValueRanges(sourcePath, edits)
+    patches = sorted((offset, kind, contentEnd, edits[position]) for position, (kind, offset, contentEnd) in ranges.items())
+
+    with open(sourcePath, "rb") as sourceFile:
+        for offset, kind, contentEnd, text in patches:
+            CopyBytes(sourceFile, destFile, offset - sourceFile.tell())
+            encodedText = escape(text).encode(encoding, "xmlcharrefreplace")
+            if kind == "missing":
+                destFile.write(b"<Value>" + encodedText + b"</Value>")
+                continue
+            startTag = ReadStartTag(sourceFile)
+            if startTag.endswith(b"/>"):
+                destFile.write(startTag[:-2].rstrip() + b">" + encodedText + b"</Value>")
+            else:
+                destFile.write(startTag + encodedText)
+                sourceFile.seek(contentEnd)
+        CopyBytes(sourceFile, destFile, None)
+
+
+def RewriteValues(sourcePath, destFile, edits):
+    """
+    Fallback for encodings that cannot be patched byte for byte: set the edited values in a parsed tree and re-serialize it
+    Missing <Value> elements are created
+    """
+    xmlTree = ET.parse(sourcePath)
+    properties = list(xmlTree.getroot().iter("Property"))
+    for position, text in edits.items():
+        valueElement = properties[position].find("Value")
+        if valueElement is None:
+            valueElement = ET.SubElement(properties[position], "Value")
+        valueElement.text = text
+    xmlTree.write(destFile, encoding="utf-8", xml_declaration=True)
+
+
+def SaveValues(sourcePath, destPath, edits):
+    """
+    Write the source config to destPath (which may be the source itself) with the edited values applied
+    The file is written to a temporary file in the destination directory and atomically renamed over destPath
+    Args:
+        edits: dict of property position -> new value text
+    Raises OSError if the file cannot be written, or ET.ParseError / ValueError if the source no longer matches
+    """
+    if not edits and os.path.exists(destPath) and os.path.samefile(sourcePath, destPath):
+        # nothing changed
+        return
+
+    destDirectory = os.path.dirname(os.path.abspath(destPath))
+    encoding = DeclaredEncoding(sourcePath)
+    tempFile = tempfile.NamedTemporaryFile(dir=destDirectory, prefix=f".{os.path.basename(destPath)}.", suffix=".tmp", delete=False)
+    try:
+        with tempFile:
+            if encoding.startswith(("utf-16", "utf-32")):
+                RewriteValues(sourcePath, tempFile, edits)
+            else:
+                PatchValues(sourcePath, tempFile, edits, encoding)
+            tempFile.flush()
+            os.fsync(tempFile.fileno())
+        if os.path.exists(destPath):
+            # keep the permissions of the file being replaced, rather than the temporary file's private ones
+            os.chmod(tempFile.name, os.stat(destPath).st_mode & 0o7777)
+        else:
+            os.chmod(tempFile.name, os.stat(sourcePath).st_mode & 0o7777)
+        os.replace(tempFile.name, destPath)
+    except BaseException:
+        os.unlink(tempFile.name)
+        raise